@@ -0,0 +1,229 @@
+"""Asset loading: a prescaled image bundle cached on disk, background audio
+loading and placeholders for missing files.
+
+Images are stored in the bundle already scaled, keyed on file name and
+size and stamped with the source file's mtime and byte size, so a later
+start only has to read raw pixels and convert them to the display format.
+Sounds and music load on a worker thread while the first frames are drawn;
+until they arrive (or if there is no audio device) play() does nothing.
+Loaded sounds are trimmed and played through audio.Voices' channel pools.
+
+A bundle that can't be read (truncated, corrupt index, short pixel data)
+is treated as empty for the entries it can't vouch for, and rewritten.
+
+Run `python assets.py` to check that a damaged bundle reloads.
+"""
+import json
+import os
+import struct
+import sys
+import threading
+import time
+
+import pygame
+
+import audio
+
+START = time.perf_counter()
+CACHE_DIR = os.environ.get("RIALO_ASSET_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "rialo-jumper")
+MAGIC = b"RJAB1\n"
+
+
+# --- Helper for PyInstaller ---
+def resource_path(relative_path):
+    if hasattr(sys, "_MEIPASS"):
+        return os.path.join(sys._MEIPASS, relative_path)
+    return os.path.join(os.path.abspath("."), relative_path)
+
+
+def warn(message):
+    print(f"warning: {message}", file=sys.stderr)
+
+
+class AssetManager:
+    def __init__(self, bundle_name, cache_dir=CACHE_DIR):
+        self.path = os.path.join(cache_dir, bundle_name)
+        self.cached = self._read_bundle()
+        self.entries = {}
+        self.from_bundle = 0
+        self.rebuilt = 0
+        self.missing = []
+
+    def _read_bundle(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return {}
+        if not data.startswith(MAGIC):
+            return {}
+        cached = {}
+        try:
+            (index_len,) = struct.unpack_from("<I", data, len(MAGIC))
+            body = len(MAGIC) + 4 + index_len
+            index = json.loads(data[len(MAGIC) + 4:body])
+            for key, meta in index.items():
+                start, length = body + meta["offset"], meta["length"]
+                pixels = data[start:start + length]
+                if len(pixels) == length and len(meta["stamp"]) == 2:
+                    cached[key] = (meta, pixels)  # short entries are left out and rebuilt
+        except (struct.error, ValueError, KeyError, TypeError, AttributeError):
+            warn(f"asset bundle {self.path} is damaged, rebuilding it")
+        return cached
+
+    def image(self, name, size, alpha=False, placeholder=None):
+        """Load `name` scaled to `size` in display format, or a placeholder if it is missing."""
+        fmt = "RGBA" if alpha else "RGB"
+        try:
+            st = os.stat(resource_path(name))
+        except OSError:
+            warn(f"{name} not found, using a placeholder")
+            self.missing.append(name)
+            surf = pygame.Surface(size, pygame.SRCALPHA if alpha else 0)
+            if placeholder is not None:
+                surf.fill(placeholder)
+            return surf.convert_alpha() if alpha else surf.convert()
+
+        key = f"{name}@{size[0]}x{size[1]}:{fmt}"
+        stamp = [st.st_mtime_ns, st.st_size]
+        meta, pixels = self.cached.get(key, (None, None))
+        if meta is not None and meta["stamp"] == stamp and len(pixels) == size[0] * size[1] * len(fmt):
+            surf = pygame.image.frombytes(pixels, size, fmt)
+            self.from_bundle += 1
+        else:
+            surf = pygame.transform.scale(pygame.image.load(resource_path(name)), size)
+            pixels = pygame.image.tobytes(surf, fmt)
+            self.rebuilt += 1
+        self.entries[key] = ({"stamp": stamp}, pixels)
+        return surf.convert_alpha() if alpha else surf.convert()
+
+    def save(self):
+        """Write the bundle if anything was rebuilt. Failures only cost the next startup."""
+        if not self.rebuilt and set(self.entries) == set(self.cached):
+            return
+        index, blobs, offset = {}, [], 0
+        for key, (meta, pixels) in self.entries.items():
+            index[key] = {"stamp": meta["stamp"], "offset": offset, "length": len(pixels)}
+            blobs.append(pixels)
+            offset += len(pixels)
+        header = json.dumps(index).encode()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(MAGIC + struct.pack("<I", len(header)) + header)
+                for pixels in blobs:
+                    f.write(pixels)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            warn(f"could not write asset bundle {self.path}: {e}")
+
+    def summary(self):
+        return (f"images: {self.from_bundle} from bundle, {self.rebuilt} rebuilt"
+                + (f", missing {', '.join(self.missing)}" if self.missing else ""))
+
+
+class SoundBank:
+    """Sounds keyed by event name, loaded on a background thread."""
+
+    def __init__(self, files, music=None, music_volume=None, pools=audio.POOLS):
+        self.files = files
+        self.music = music
+        self.music_volume = music_volume
+        self.pools = pools
+        self.sounds = {}
+        self.voices = None
+        self.ready = threading.Event()
+        self.load_ms = None
+
+    def load_async(self):
+        threading.Thread(target=self._load, name="audio-loader", daemon=True).start()
+        return self
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error as e:
+            warn(f"no audio: {e}")
+            self.ready.set()
+            return
+        self.voices = audio.Voices(self.pools)
+        for event, name in self.files.items():
+            try:
+                self.sounds[event] = audio.prepare(pygame.mixer.Sound(resource_path(name)))
+            except (pygame.error, FileNotFoundError) as e:
+                warn(f"could not load {name}: {e}")
+        if self.music:
+            try:
+                pygame.mixer.music.load(resource_path(self.music))
+                if self.music_volume is not None:
+                    pygame.mixer.music.set_volume(self.music_volume)
+                pygame.mixer.music.play(-1)
+            except (pygame.error, FileNotFoundError) as e:
+                warn(f"could not load {self.music}: {e}")
+        self.load_ms = (time.perf_counter() - start) * 1000
+        self.ready.set()
+
+    def play(self, event):
+        sound = self.sounds.get(event)
+        if sound is not None:
+            self.voices.play(event, sound)
+
+    def summary(self):
+        return self.voices.summary() if self.voices else "voices: no audio"
+
+
+class StartupReport:
+    """Records time from process start to the first presented frame."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.first_frame_ms = None
+
+    def frame_presented(self, assets, sounds):
+        if self.first_frame_ms is not None:
+            return
+        self.first_frame_ms = (time.perf_counter() - START) * 1000
+        assets.save()
+        if self.enabled:
+            if not sounds.ready.is_set():
+                audio = "audio still loading"
+            else:
+                audio = f"audio loaded in {sounds.load_ms:.0f} ms" if sounds.load_ms is not None else "no audio"
+            print(f"time to first frame: {self.first_frame_ms:.0f} ms ({assets.summary()}; {audio})")
+
+
+def add_arguments(parser):
+    parser.add_argument("--startup-report", action="store_true", help="print time-to-first-frame and asset cache use")
+    parser.add_argument("--audio-report", action="store_true", help="print voice pool counters on exit")
+    return parser
+
+
+# --- Self-check ---
+if __name__ == "__main__":
+    import tempfile
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    with tempfile.TemporaryDirectory() as tmp:
+        def load():
+            images = AssetManager("check.bundle", tmp)
+            images.image("background.png", (800, 400))
+            images.image("rialo_logo.png", (50, 50), alpha=True)
+            images.save()
+            return images
+
+        load()
+        path = os.path.join(tmp, "check.bundle")
+        with open(path, "rb") as f:
+            data = f.read()
+        for cut in (len(MAGIC) + 2, len(MAGIC) + 20, len(data) - 100):
+            with open(path, "wb") as f:
+                f.write(data[:cut])
+            print(f"truncated to {cut} bytes: {load().summary()}")
+            images = load()
+            assert images.from_bundle == 2 and not images.rebuilt, images.summary()
+            print(f"  and reloaded: {images.summary()}")
+    pygame.quit()
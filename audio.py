@@ -0,0 +1,180 @@
+"""Voice management for SoundBank: channel pools, rate limiting and trimmed sounds.
+
+Sound.play() takes whatever mixer channel is free, so a burst of score
+sounds at high speed can take every channel and cut off the collision.
+Instead each pool of events gets its own reserved channels. A trigger of
+an event within `window_ms` of its last start is coalesced into the voice
+already playing; when every channel of the pool is busy the voice closest
+to finishing is stolen (pools where the newest sound matters) or the
+trigger is dropped. Channels are tracked by when their sound ends, so
+picking one needs no mixer calls.
+
+pygame.mixer.Sound already decodes a WAV to the mixer's sample format when
+it loads. prepare() also trims leading and trailing silence and fades the
+cut, so voices start sooner and hand their channel back sooner: the
+shipped sounds are mostly silence after their first half second.
+
+Run `python audio.py` to replay a fast run's sound triggers through the
+pools and through plain Sound.play().
+"""
+import os
+import time
+
+import numpy as np
+import pygame
+
+SILENCE = 32  # peak sample level treated as silence (about -60 dBFS)
+FADE_MS = 5
+
+
+class Pool:
+    def __init__(self, name, events, channels, window_ms, steal):
+        self.name = name
+        self.events = events
+        self.size = channels
+        self.window = window_ms / 1000
+        self.steal = steal
+        self.channels = []
+        self.ends = []  # when each channel's voice finishes
+        self.played = self.coalesced = self.dropped = self.stolen = 0
+
+
+# name, events, channels, coalescing window (ms), steal the oldest voice when full
+POOLS = (
+    ("jump", ("jump", "double_jump"), 2, 40, True),
+    ("score", ("score",), 2, 90, False),
+    ("powerup", ("powerup",), 1, 120, True),
+    ("hit", ("collision",), 1, 250, False),
+)
+
+
+def prepare(sound):
+    """Copy of `sound` without leading or trailing silence, faded in and out over FADE_MS."""
+    try:
+        samples = pygame.sndarray.array(sound)
+    except (pygame.error, ValueError):
+        return sound
+    level = np.abs(samples.astype(np.int32))
+    if level.ndim > 1:
+        level = level.max(axis=1)
+    audible = np.flatnonzero(level > SILENCE)
+    if not len(audible):
+        return sound
+    start, end = audible[0], audible[-1] + 1
+    if start == 0 and end == len(samples):
+        return sound
+    samples = samples[start:end].copy()
+    fade = min(len(samples) // 2, pygame.mixer.get_init()[0] * FADE_MS // 1000)
+    if fade:
+        ramp = np.linspace(0, 1, fade)
+        if samples.ndim > 1:
+            ramp = ramp[:, None]
+        samples[:fade] = samples[:fade] * ramp
+        samples[-fade:] = samples[-fade:] * ramp[::-1]
+    trimmed = pygame.sndarray.make_sound(samples)
+    trimmed.set_volume(sound.get_volume())
+    return trimmed
+
+
+class Voices:
+    """Reserves the first mixer channels for POOLS; the mixer must be initialised."""
+
+    def __init__(self, pools=POOLS, spare=2):
+        self.pools = [Pool(*spec) for spec in pools]
+        reserved = sum(pool.size for pool in self.pools)
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved + spare))
+        pygame.mixer.set_reserved(reserved)
+        self.pool_of = {}
+        index = 0
+        for pool in self.pools:
+            pool.channels = [pygame.mixer.Channel(index + i) for i in range(pool.size)]
+            pool.ends = [0.0] * pool.size
+            index += pool.size
+            for event in pool.events:
+                self.pool_of[event] = pool
+        self.last = {}  # event -> time of its last start
+        self.unpooled = 0
+
+    def play(self, event, sound, now=None):
+        pool = self.pool_of.get(event)
+        if pool is None:
+            sound.play()
+            self.unpooled += 1
+            return
+        now = time.perf_counter() if now is None else now
+        if now - self.last.get(event, -1e9) < pool.window:
+            pool.coalesced += 1
+            return
+        ends = pool.ends
+        i = ends.index(min(ends))
+        if ends[i] > now:
+            if not pool.steal:
+                pool.dropped += 1
+                return
+            pool.stolen += 1
+        pool.channels[i].play(sound)
+        ends[i] = now + sound.get_length()
+        self.last[event] = now
+        pool.played += 1
+
+    def summary(self):
+        parts = [f"{p.name} {p.played} played/{p.coalesced} coalesced/{p.dropped} dropped/{p.stolen} stolen"
+                 for p in self.pools]
+        return "voices: " + ", ".join(parts) + f"; {self.unpooled} unpooled"
+
+
+# --- Benchmark ---
+def trigger_trace(seconds=60, seed=3, stall_every=2.0, stall=0.25):
+    """(time, event) sound triggers of an autopilot run whose frames stall for
+    `stall` seconds every `stall_every`: the catch-up ticks after a stall all
+    play their sounds in the same frame."""
+    import simulation as sim
+    state = sim.GameState(seed)
+    sim.press_jump(state)
+    trace = []
+    for tick in range(seconds * sim.FPS):
+        if state.game_over:
+            sim.press_jump(state)
+        t = tick / sim.FPS
+        if t % stall_every < stall:
+            t += stall - t % stall_every  # held back until the stall ends
+        for event in sim.step(state, sim.autopilot(state)):
+            if event != "start":
+                trace.append((t, event))
+    return trace
+
+
+def benchmark():
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.mixer.init()
+    names = {"jump": "jump.wav", "double_jump": "double_jump.wav", "score": "score.wav",
+             "powerup": "powerup.wav", "collision": "collision.wav"}
+    raw = {event: pygame.mixer.Sound(name) for event, name in names.items()}
+    start = time.perf_counter()
+    trimmed = {event: prepare(sound) for event, sound in raw.items()}
+    prepare_ms = (time.perf_counter() - start) * 1000
+    for event in names:
+        print(f"{event:<12} {raw[event].get_length():5.2f} s -> {trimmed[event].get_length():5.2f} s")
+    print(f"prepare(): {prepare_ms:.1f} ms for {len(names)} sounds")
+
+    trace = trigger_trace()
+
+    def peak(sounds):
+        # Voice occupancy from sound lengths alone, so no real playback is needed.
+        playing, most = [], 0
+        for t, event in trace:
+            playing = [end for end in playing if end > t] + [t + sounds[event].get_length()]
+            most = max(most, len(playing))
+        return most
+
+    voices = Voices()
+    for t, event in trace:
+        voices.play(event, trimmed[event], now=t)
+    print(f"{len(trace)} triggers in 60 s with a stall every 2 s: Sound.play() peaks at {peak(raw)} overlapping "
+          f"voices, {peak(trimmed)} with trimmed sounds (mixer has {pygame.mixer.get_num_channels()} channels)")
+    print(voices.summary())
+    pygame.mixer.quit()
+
+
+if __name__ == "__main__":
+    benchmark()
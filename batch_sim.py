@@ -0,0 +1,317 @@
+"""NumPy batch engine: steps N Rialo Jumper games at once with the rules from simulation.py.
+
+Games are held as struct-of-arrays. Obstacles and powerups live in padded
+(N, capacity) arrays kept compacted in spawn order, so the per-slot loop in
+step() reproduces the scalar engine's list iteration exactly (including
+speed-ups that land mid-loop) while every operation is vectorized across games.
+
+Run `python batch_sim.py` for a parity check against simulation.step().
+"""
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+import simulation as sim
+
+from entities import FIREWALL, SPIKE, SCORE_BOOST, SLOWDOWN, INVINCIBLE
+
+NO_POWERUP = -1
+
+
+def rect_round(values):
+    # pygame.Rect rounds float coordinates half away from zero.
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+
+def overlaps(ax, ay, aw, ah, bx, by, bw, bh):
+    return (ax < bx + bw) & (bx < ax + aw) & (ay < by + bh) & (by < ay + ah)
+
+
+class BatchState:
+    def __init__(self, n=None, seed=None, seeds=None, max_obstacles=24, max_powerups=4):
+        """Pass `seeds` to draw from one random.Random per game, exactly like
+        simulation.GameState(seed); otherwise a single NumPy generator is used."""
+        if seeds is not None:
+            n = len(seeds)
+            self.rngs = [random.Random(s) for s in seeds]
+            self.np_rng = None
+        else:
+            self.rngs = None
+            self.np_rng = np.random.default_rng(seed)
+        self.n = n
+        self.overflow = 0
+
+        # --- Per-game scalars ---
+        self.game_active = np.zeros(n, bool)
+        self.game_over = np.zeros(n, bool)
+        self.frame = np.zeros(n, np.int64)
+        self.spawn_timer = np.zeros(n, np.int64)
+        self.player_y = np.full(n, sim.GROUND_Y, np.int64)
+        self.player_velocity = np.zeros(n)
+        self.jumps_left = np.full(n, sim.MAX_JUMPS, np.int64)
+        self.score = np.zeros(n, np.int64)
+        self.spawn_interval = np.full(n, sim.SPAWN_INTERVAL, np.int64)
+        self.obstacle_speed = np.full(n, float(sim.OBSTACLE_SPEED))
+        self.active_powerup = np.full(n, NO_POWERUP, np.int64)
+        self.powerup_timer = np.zeros(n, np.int64)
+        self.invincible = np.zeros(n, bool)
+
+        # --- Padded obstacle / powerup slots ---
+        self.ob_alive = np.zeros((n, max_obstacles), bool)
+        self.ob_x = np.zeros((n, max_obstacles), np.int64)
+        self.ob_y = np.zeros((n, max_obstacles), np.int64)
+        self.ob_h = np.zeros((n, max_obstacles), np.int64)
+        self.ob_type = np.zeros((n, max_obstacles), np.int64)
+        self.pu_alive = np.zeros((n, max_powerups), bool)
+        self.pu_x = np.zeros((n, max_powerups), np.int64)
+        self.pu_y = np.zeros((n, max_powerups), np.int64)
+        self.pu_type = np.zeros((n, max_powerups), np.int64)
+
+    def reset(self, mask):
+        # Same fields as GameState.reset(); spawn_timer and frame carry over.
+        self.player_y[mask] = sim.GROUND_Y
+        self.player_velocity[mask] = 0
+        self.jumps_left[mask] = sim.MAX_JUMPS
+        self.ob_alive[mask] = False
+        self.pu_alive[mask] = False
+        self.score[mask] = 0
+        self.game_over[mask] = False
+        self.spawn_interval[mask] = sim.SPAWN_INTERVAL
+        self.obstacle_speed[mask] = sim.OBSTACLE_SPEED
+        self.active_powerup[mask] = NO_POWERUP
+        self.powerup_timer[mask] = 0
+        self.invincible[mask] = False
+
+    # --- Random draws ---
+    def _draw_obstacles(self, idx):
+        m = len(idx)
+        if self.rngs is not None:
+            types, heights, paired, offsets = (np.zeros(m, np.int64) for _ in range(4))
+            for i, g in enumerate(idx):
+                rng = self.rngs[g]
+                types[i] = rng.choice(sim.OBSTACLE_TYPES)
+                heights[i] = rng.randint(*sim.OBSTACLE_HEIGHTS[types[i]])
+                if rng.random() < sim.PAIR_CHANCE:
+                    paired[i] = 1
+                    offsets[i] = rng.randint(50, 120)
+            return types, heights, paired.astype(bool), offsets
+        rng = self.np_rng
+        types = rng.integers(0, len(sim.OBSTACLE_TYPES), m)
+        (flo, fhi), (slo, shi) = sim.OBSTACLE_HEIGHTS[FIREWALL], sim.OBSTACLE_HEIGHTS[SPIKE]
+        heights = np.where(types == FIREWALL, rng.integers(flo, fhi + 1, m), rng.integers(slo, shi + 1, m))
+        paired = rng.random(m) < sim.PAIR_CHANCE
+        offsets = rng.integers(50, 121, m)
+        return types, heights, paired, offsets
+
+    def _draw_powerups(self, idx):
+        m = len(idx)
+        if self.rngs is not None:
+            types, ys = np.zeros(m, np.int64), np.zeros(m, np.int64)
+            for i, g in enumerate(idx):
+                rng = self.rngs[g]
+                types[i] = rng.choice(sim.POWERUP_TYPES)
+                ys[i] = rng.randint(150, 250)
+            return types, ys
+        rng = self.np_rng
+        return rng.integers(0, len(sim.POWERUP_TYPES), m), rng.integers(150, 251, m)
+
+    # --- Slot helpers ---
+    def _append(self, alive, rows, columns):
+        # First free slot per row; entries beyond capacity are dropped and counted.
+        free = ~alive[rows]
+        has_room = free.any(axis=1)
+        self.overflow += int((~has_room).sum())
+        slot = free.argmax(axis=1)
+        rows, slot = rows[has_room], slot[has_room]
+        for array, values in columns:
+            array[rows, slot] = values[has_room]
+        alive[rows, slot] = True
+
+    @staticmethod
+    def _compact(rows, arrays):
+        # Stable-sort live slots to the front so slot order stays spawn order.
+        if len(rows) == 0:
+            return
+        alive = arrays[0]
+        order = np.argsort(~alive[rows], axis=1, kind="stable")
+        for array in arrays:
+            array[rows] = np.take_along_axis(array[rows], order, axis=1)
+
+
+def step(batch, jump_pressed=None, jump_released=None):
+    """Advance every game one frame. Returns a bool mask of games that collided."""
+    b = batch
+    # --- Inputs ---
+    if jump_pressed is not None:
+        starting = jump_pressed & ~b.game_active
+        if starting.any():
+            b.game_active |= starting
+            b.reset(starting)
+        jumping = jump_pressed & ~starting & (b.jumps_left > 0)
+        b.player_velocity[jumping] = sim.JUMP_STRENGTH
+        b.jumps_left[jumping] -= 1
+    if jump_released is not None:
+        cut = jump_released & (b.player_velocity < 0)
+        b.player_velocity[cut] *= sim.JUMP_CUT
+
+    run = b.game_active.copy()
+    collided = np.zeros(b.n, bool)
+    if not run.any():
+        return collided
+    b.frame[run] += 1
+
+    # --- Player physics ---
+    b.player_velocity[run] += sim.GRAVITY
+    b.player_y[run] = rect_round(b.player_y[run] + b.player_velocity[run])
+    landed = run & (b.player_y > sim.GROUND_Y)
+    b.player_y[landed] = sim.GROUND_Y
+    b.player_velocity[landed] = 0
+    b.jumps_left[landed] = sim.MAX_JUMPS
+
+    # --- Obstacle spawning ---
+    b.spawn_timer[run] += 1
+    spawning = np.flatnonzero(run & (b.spawn_timer > b.spawn_interval))
+    if len(spawning):
+        types, heights, paired, offsets = b._draw_obstacles(spawning)
+        y_pos = sim.HEIGHT - heights
+        x = np.full(len(spawning), sim.WIDTH, np.int64)
+        b._append(b.ob_alive, spawning, [(b.ob_x, x), (b.ob_y, y_pos), (b.ob_h, heights), (b.ob_type, types)])
+        pairs = paired.nonzero()[0]
+        b._append(b.ob_alive, spawning[pairs], [(b.ob_x, x[pairs] + offsets[pairs]), (b.ob_y, y_pos[pairs]),
+                                                 (b.ob_h, heights[pairs]), (b.ob_type, types[pairs])])
+        b.spawn_timer[spawning] = 0
+
+    # --- Obstacles + collisions, one slot at a time in spawn order ---
+    wobble = np.sin(b.frame * (1000 / sim.FPS / 200)) * 2
+    hx, hy = sim.PLAYER_X + 5, b.player_y + 35
+    removed = np.zeros(b.n, bool)
+    for k in range(b.ob_alive.shape[1]):
+        live = run & b.ob_alive[:, k]
+        if not live.any():
+            break
+        b.ob_x[live, k] = rect_round(b.ob_x[live, k] - b.obstacle_speed[live])
+        spikes = live & (b.ob_type[:, k] == SPIKE)
+        b.ob_y[spikes, k] = rect_round(b.ob_y[spikes, k] + wobble[spikes])
+
+        hit = live & ~b.invincible & overlaps(hx, hy, 40, 15, b.ob_x[:, k], b.ob_y[:, k], sim.OBSTACLE_WIDTH, b.ob_h[:, k])
+        collided |= hit
+
+        gone = live & (b.ob_x[:, k] + sim.OBSTACLE_WIDTH < 0)
+        if gone.any():
+            b.ob_alive[gone, k] = False
+            removed |= gone
+            b.score[gone] += 1
+            harder = gone & (b.score % sim.SPEEDUP_EVERY == 0) & (b.spawn_interval > sim.MIN_SPAWN_INTERVAL)
+            b.spawn_interval[harder] -= sim.SPAWN_INTERVAL_STEP
+            b.obstacle_speed[harder] += sim.SPEED_STEP
+    b._compact(np.flatnonzero(removed), (b.ob_alive, b.ob_x, b.ob_y, b.ob_h, b.ob_type))
+
+    # --- Powerups ---
+    b.powerup_timer[run] += 1
+    spawning = np.flatnonzero(run & (b.powerup_timer > sim.POWERUP_INTERVAL))
+    if len(spawning):
+        types, ys = b._draw_powerups(spawning)
+        b._append(b.pu_alive, spawning, [(b.pu_x, np.full(len(spawning), sim.WIDTH, np.int64)), (b.pu_y, ys), (b.pu_type, types)])
+        b.powerup_timer[spawning] = 0
+
+    py = b.player_y
+    removed = np.zeros(b.n, bool)
+    for k in range(b.pu_alive.shape[1]):
+        live = run & b.pu_alive[:, k]
+        if not live.any():
+            break
+        b.pu_x[live, k] -= sim.POWERUP_SPEED
+        got = live & overlaps(sim.PLAYER_X, py, sim.PLAYER_SIZE, sim.PLAYER_SIZE,
+                              b.pu_x[:, k], b.pu_y[:, k], sim.POWERUP_SIZE, sim.POWERUP_SIZE)
+        gone = got | (live & (b.pu_x[:, k] + sim.POWERUP_SIZE < 0))
+        b.pu_alive[gone, k] = False
+        removed |= gone
+        if got.any():
+            kind = b.pu_type[:, k]
+            b.active_powerup[got] = kind[got]
+            b.powerup_timer[got] = 0
+            b.score[got & (kind == SCORE_BOOST)] += 5
+            slow = got & (kind == SLOWDOWN)
+            b.obstacle_speed[slow] = np.maximum(sim.SLOWDOWN_MIN_SPEED, b.obstacle_speed[slow] - sim.SLOWDOWN_STEP)
+            b.invincible[got & (kind == INVINCIBLE)] = True
+    b._compact(np.flatnonzero(removed), (b.pu_alive, b.pu_x, b.pu_y, b.pu_type))
+
+    powered = run & (b.active_powerup != NO_POWERUP)
+    b.powerup_timer[powered] += 1
+    expired = powered & (b.powerup_timer >= sim.POWERUP_DURATION)
+    if expired.any():
+        b.obstacle_speed[expired & (b.active_powerup == SLOWDOWN)] += sim.SLOWDOWN_STEP
+        b.invincible[expired & (b.active_powerup == INVINCIBLE)] = False
+        b.active_powerup[expired] = NO_POWERUP
+        b.powerup_timer[expired] = 0
+
+    b.game_active[collided] = False
+    b.game_over[collided] = True
+    return collided
+
+
+def autopilot(batch, lead=14, double_jump_velocity=-8):
+    """Vectorized simulation.autopilot(): returns the jump_pressed mask."""
+    b = batch
+    hitbox_left = sim.PLAYER_X + 5
+    ahead = b.ob_alive & (b.ob_x + sim.OBSTACLE_WIDTH > hitbox_left)
+    nearest = np.where(ahead, b.ob_x, np.iinfo(np.int64).max).min(axis=1)
+    dist = nearest - (hitbox_left + 40)
+    jump = (b.player_y >= sim.GROUND_Y) & (dist < b.obstacle_speed * lead)
+    double = (b.jumps_left == 1) & (b.player_velocity > double_jump_velocity)
+    return b.game_active & ahead.any(axis=1) & (jump | double)
+
+
+# --- Parity check against the scalar engine ---
+def random_inputs(n, frames, seed=0, press_chance=0.04, release_chance=0.1):
+    rng = np.random.default_rng(seed)
+    pressed = rng.random((frames, n)) < press_chance
+    pressed[0] = True  # start every game on the first frame
+    released = rng.random((frames, n)) < release_chance
+    return pressed, released
+
+
+def check_parity(seeds, frames=3000):
+    """Run the same seeds and inputs through both engines; return mismatching games."""
+    # Autopilot keeps runs alive long enough to reach powerups and speed-ups;
+    # the random presses and releases exercise double jumps and jump cuts.
+    pressed, released = random_inputs(len(seeds), frames, press_chance=0.01)
+    batch = BatchState(seeds=seeds)
+    states = [sim.GameState(seed=s) for s in seeds]
+    mismatched = set()
+    for f in range(frames):
+        inputs = [sim.autopilot(state) for state in states]
+        for g, state in enumerate(states):
+            inputs[g] = sim.Inputs(inputs[g].jump_pressed or bool(pressed[f, g]), bool(released[f, g]))
+        step(batch, np.array([i.jump_pressed for i in inputs]), released[f])
+        for g, state in enumerate(states):
+            if g in mismatched:
+                continue
+            sim.step(state, inputs[g])
+            live = np.flatnonzero(batch.ob_alive[g])
+            expected = [(o.rect.x, o.rect.y, o.kind) for o in state.obstacles]
+            actual = list(zip(batch.ob_x[g, live].tolist(), batch.ob_y[g, live].tolist(), batch.ob_type[g, live].tolist()))
+            if (state.player_rect.y != batch.player_y[g] or state.score != batch.score[g]
+                    or state.game_over != batch.game_over[g] or not math.isclose(state.obstacle_speed, batch.obstacle_speed[g])
+                    or len(state.powerups) != batch.pu_alive[g].sum() or expected != actual):
+                mismatched.add(g)
+    return sorted(mismatched)
+
+
+if __name__ == "__main__":
+    bad = check_parity(list(range(64)))
+    print(f"parity: {64 - len(bad)}/64 games match" + (f", mismatched seeds {bad}" if bad else ""))
+
+    n, frames = 4096, 1000
+    batch = BatchState(n, seed=0)
+    _, released = random_inputs(n, frames)
+    step(batch, np.ones(n, bool))
+    start = time.perf_counter()
+    for f in range(frames):
+        step(batch, autopilot(batch) | batch.game_over, released[f])
+    elapsed = time.perf_counter() - start
+    print(f"{n} games x {frames} frames: {n * frames / elapsed:,.0f} game-frames/s")
+    sys.exit(1 if bad else 0)
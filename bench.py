@@ -0,0 +1,288 @@
+"""Headless frame-time benchmarks for main.py and rialo_runner.py.
+
+Each (game, scenario) pair runs in a fresh process under SDL's dummy video
+and audio drivers, uncapped and with a fixed seed. A hook on
+pygame.event.get() marks frame boundaries, posts the scenario's scripted
+SPACE presses and pokes at the game's state (invincibility, speed) through
+the game's own frame on the stack, so neither game needs a benchmark mode
+of its own.
+
+Every pair runs twice: once for frame times and gc collections, and once
+under tracemalloc (which skews timings) for the peak memory each frame
+allocates above what was live when it started.
+
+    python bench.py -o bench.json
+    python bench.py --games main --scenarios late_game --frames 2000
+    python bench.py -o new.json --compare bench.json
+    python bench.py --scenarios normal --alloc-budget 4096
+
+--alloc-budget exits with status 1 if any measured frame of a "normal"
+scenario allocates more than the budget, which catches per-frame Surfaces,
+list copies and Rects creeping back into the loop.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+GAMES = {"main": "main.py", "runner": "rialo_runner.py"}
+SEED = 1
+
+# Logical state names -> per-game accessors. main.py keeps its state in the
+# GameState local of main(); the runner keeps module globals.
+STATE_NAMES = {
+    "main": {"active": "game_active", "speed": "obstacle_speed", "spawn_interval": "spawn_interval",
+             "invincible": "invincible", "jumps_left": "jumps_left"},
+    "runner": {"active": "game_active", "speed": "obstacle_speed", "spawn_interval": "spawn_interval",
+               "invincible": "shield_active"},
+}
+
+
+def game_frame(game, frame):
+    """The innermost frame running the game's own file: main.py polls events
+    through latency.InputLatch, so the direct caller isn't it."""
+    caller = frame
+    while frame is not None:
+        if os.path.basename(frame.f_code.co_filename) == GAMES[game]:
+            return frame
+        frame = frame.f_back
+    return caller
+
+
+class GameHandle:
+    def __init__(self, game, frame):
+        self.names = STATE_NAMES[game]
+        self.state = frame.f_locals.get("state")
+        self.globals = frame.f_globals
+
+    def get(self, name):
+        attr = self.names[name]
+        return getattr(self.state, attr) if self.state is not None else self.globals.get(attr)
+
+    def set(self, name, value):
+        attr = self.names.get(name)
+        if attr is None:
+            return
+        if self.state is not None:
+            setattr(self.state, attr, value)
+        else:
+            self.globals[attr] = value
+            if attr == "shield_active":
+                self.globals["shield_timer"] = 300
+
+    def player_y(self):
+        rect = self.state.player_rect if self.state is not None else self.globals["player_rect"]
+        return rect.y
+
+
+# --- Scenarios: script(frame, handle) -> "down", "up" or None ---
+def idle(frame, game):
+    return None
+
+
+def normal_run(frame, game):
+    if frame == 1:
+        return "down"
+    game.set("invincible", True)
+    return {0: "down", 10: "up"}.get(frame % 50)
+
+
+def late_game(frame, game):
+    if frame > 1:
+        game.set("speed", 15)
+        game.set("spawn_interval", 40)
+    return normal_run(frame, game)
+
+
+def jump_spam(frame, game):
+    if frame == 1:
+        return "down"
+    game.set("invincible", True)
+    if frame % 3 == 0 and game.player_y() >= 150:
+        game.set("jumps_left", 1)  # every press is a double jump (and a particle burst) in main.py
+        return "down"
+    return "up" if frame % 3 == 1 else None
+
+
+SCENARIOS = {"idle": idle, "normal": normal_run, "late_game": late_game, "jump_spam": jump_spam}
+
+
+# --- Child: run one game under the hook ---
+def run_child(game, scenario, frames, warmup, trace, game_args):
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    import pygame
+
+    script = SCENARIOS[scenario]
+    total = warmup + frames
+    times, allocs, gcs = [], [], []
+    count = [0]
+    mark = [0, 0]  # perf_counter_ns and traced bytes when the previous frame started
+    real_get = pygame.event.get
+
+    def gc_count():
+        return sum(s["collections"] for s in gc.get_stats())
+
+    def get(*args, **kwargs):
+        now = time.perf_counter_ns()
+        n = count[0]
+        if n > warmup:
+            times.append(now - mark[0])
+            if trace:
+                allocs.append(tracemalloc.get_traced_memory()[1] - mark[1])
+        if n == warmup:
+            gcs.append(gc_count())
+        if n >= total:
+            gcs.append(gc_count())
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        else:
+            action = script(n, GameHandle(game, game_frame(game, sys._getframe(1))))
+            if action == "down":
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+            elif action == "up":
+                pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_SPACE))
+        count[0] = n + 1
+        result = real_get(*args, **kwargs)
+        if trace:
+            tracemalloc.reset_peak()
+            mark[1] = tracemalloc.get_traced_memory()[0]
+        mark[0] = time.perf_counter_ns()
+        return result
+
+    pygame.event.get = get
+    if trace:
+        tracemalloc.start()
+    sys.argv = [GAMES[game], "--seed", str(SEED), "--fps", "0", "--no-run-log"] + game_args
+    try:
+        runpy.run_path(GAMES[game], run_name="__main__")
+    except SystemExit:
+        pass
+    return {"times_ns": times, "alloc_bytes": allocs, "gc_collections": gcs[-1] - gcs[0] if len(gcs) > 1 else None}
+
+
+# --- Parent ---
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def run_one(game, scenario, frames, warmup, trace, game_args):
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "result.json")
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", game, scenario, "--frames", str(frames),
+               "--warmup", str(warmup), "--out", out] + (["--trace"] if trace else [])
+        if game_args:
+            cmd += ["--game-args", " ".join(game_args)]
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__)))
+        with open(out) as f:
+            return json.load(f)
+
+
+def summarize(timing, tracing):
+    ms = [t / 1e6 for t in timing["times_ns"]]
+    allocs = tracing["alloc_bytes"] if tracing else []
+    return {
+        "frames": len(ms),
+        "mean_ms": round(sum(ms) / max(1, len(ms)), 4),
+        "p50_ms": round(percentile(ms, 50), 4),
+        "p95_ms": round(percentile(ms, 95), 4),
+        "p99_ms": round(percentile(ms, 99), 4),
+        "max_ms": round(max(ms), 4),
+        "gc_collections": timing["gc_collections"],
+        "alloc_bytes_p50": percentile(allocs, 50),
+        "alloc_bytes_p99": percentile(allocs, 99),
+        "alloc_bytes_mean": round(sum(allocs) / len(allocs)) if allocs else None,
+        "alloc_bytes_max": max(allocs) if allocs else None,
+    }
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    import pygame
+    return {"commit": commit, "python": platform.python_version(), "pygame": pygame.version.ver,
+            "platform": platform.platform(), "seed": SEED}
+
+
+def compare(results, base):
+    print("\nvs baseline:")
+    for game, scenarios in results.items():
+        for scenario, new in scenarios.items():
+            old = base.get(game, {}).get(scenario)
+            if not old:
+                continue
+            changes = [f"{key} {(new[key] / old[key] - 1) * 100:+.1f}%" for key in ("p50_ms", "p99_ms") if old.get(key)]
+            print(f"  {game:<7} {scenario:<10} " + ", ".join(changes))
+
+
+def check_budget(results, budget):
+    failed = 0
+    for game, scenarios in results.items():
+        worst = scenarios.get("normal", {}).get("alloc_bytes_max")
+        if worst is None:
+            continue
+        verdict = "ok" if worst <= budget else "OVER BUDGET"
+        print(f"{game}: worst frame of a normal run allocates {worst:,} B (budget {budget:,} B): {verdict}")
+        failed |= worst > budget
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="headless frame-time benchmarks")
+    parser.add_argument("-o", "--out", default="bench.json", help="results file (default: bench.json)")
+    parser.add_argument("--games", nargs="+", choices=GAMES, default=list(GAMES))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=600, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=120, help="frames skipped before measuring")
+    parser.add_argument("--game-args", default="", help="extra arguments passed to the game, e.g. '--dirty-rects'")
+    parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--alloc-budget", type=int, metavar="BYTES",
+                        help="fail if a frame of the normal scenario allocates more than BYTES")
+    parser.add_argument("--compare", metavar="BASE", help="print p50/p99 changes against an earlier results file")
+    parser.add_argument("--child", nargs=2, metavar=("GAME", "SCENARIO"), help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    game_args = args.game_args.split()
+
+    if args.child:
+        result = run_child(*args.child, args.frames, args.warmup, args.trace, game_args)
+        with open(args.out, "w") as f:
+            json.dump(result, f)
+        return
+
+    results = {}
+    print(f"{'game':<7} {'scenario':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'alloc/frame':>12}")
+    for game in args.games:
+        for scenario in args.scenarios:
+            timing = run_one(game, scenario, args.frames, args.warmup, False, game_args)
+            tracing = None if args.no_alloc else run_one(game, scenario, args.frames, args.warmup, True, game_args)
+            row = results.setdefault(game, {})[scenario] = summarize(timing, tracing)
+            alloc = f"{row['alloc_bytes_mean']:,} B" if row["alloc_bytes_mean"] is not None else "-"
+            print(f"{game:<7} {scenario:<10} {row['p50_ms']:8.3f} {row['p95_ms']:8.3f} {row['p99_ms']:8.3f} {alloc:>12}")
+
+    report = {"meta": dict(metadata(), frames=args.frames, warmup=args.warmup, game_args=game_args),
+              "results": results}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+    if args.alloc_budget is not None:
+        sys.exit(check_budget(results, args.alloc_budget))
+
+
+if __name__ == "__main__":
+    main()
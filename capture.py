@@ -0,0 +1,328 @@
+"""Gameplay video capture off the game thread.
+
+grab() takes a zero-copy view of the screen's pixels (Surface.get_view) and
+copies it into a free slot of a ring of shared-memory frames: one memcpy per
+frame and no allocation. An encoder process turns filled slots into a PNG
+sequence, an animated GIF or raw RGB24 video and hands each slot back. When
+every slot is still waiting to be encoded the frame is dropped, so a slow
+encoder costs frames, never frame time. The encoder runs in its own process
+because GIF compression is pure Python and would hold the GIL.
+
+The format follows the path: a .gif file, a .rgb/.raw file (play or convert
+with ffmpeg -f rawvideo -pix_fmt rgb24 ...), or anything else as a directory
+of numbered PNGs named after the frame they were grabbed on.
+
+Run `python capture.py` to check the raw video hint and measure grab cost
+and encoder throughput.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    return {".gif": "gif", ".rgb": "raw", ".raw": "raw"}.get(ext, "png")
+
+
+# --- Encoders (run in the worker process) ---
+class RawWriter:
+    def __init__(self, path, size):
+        self.file = open(path, "wb")
+
+    def write(self, rgb, frame, delay):
+        self.file.write(rgb.tobytes())
+
+    def close(self):
+        self.file.close()
+
+
+class PngWriter:
+    def __init__(self, path, size):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.size = size
+
+    def write(self, rgb, frame, delay):
+        surf = pygame.image.frombuffer(rgb.tobytes(), self.size, "RGB")
+        pygame.image.save(surf, os.path.join(self.path, f"frame_{frame:06d}.png"))
+
+    def close(self):
+        pass
+
+
+def _lzw(indices, min_code_size=8):
+    """GIF-flavoured LZW of a bytes object; returns the packed code stream."""
+    clear, end = 1 << min_code_size, (1 << min_code_size) + 1
+    out = bytearray()
+    bits = nbits = 0
+    code_size = min_code_size + 1
+
+    def emit(code):
+        nonlocal bits, nbits
+        bits |= code << nbits
+        nbits += code_size
+        while nbits >= 8:
+            out.append(bits & 0xFF)
+            bits >>= 8
+            nbits -= 8
+
+    table = {bytes([i]): i for i in range(clear)}
+    next_code = end + 1
+    emit(clear)
+    word = indices[:1]
+    for i in range(1, len(indices)):
+        c = indices[i:i + 1]
+        longer = word + c
+        if longer in table:
+            word = longer
+            continue
+        emit(table[word])
+        if next_code == 4096:
+            emit(clear)
+            table = {bytes([i]): i for i in range(clear)}
+            next_code = end + 1
+            code_size = min_code_size + 1
+        else:
+            table[longer] = next_code
+            next_code += 1
+            if next_code > 1 << code_size and code_size < 12:
+                code_size += 1
+        word = c
+    emit(table[word])
+    emit(end)
+    if nbits:
+        out.append(bits & 0xFF)
+    return out
+
+
+class GifWriter:
+    """Animated GIF on a fixed 6x6x6 colour cube; each frame is written once the next
+    one arrives, so its delay covers any frames dropped in between."""
+
+    def __init__(self, path, size):
+        self.file = open(path, "wb")
+        w, h = size
+        self.file.write(b"GIF89a" + w.to_bytes(2, "little") + h.to_bytes(2, "little") + bytes([0xF7, 0, 0]))
+        i = np.minimum(np.arange(256), 215)
+        palette = np.stack([i // 36, i // 6 % 6, i % 6], axis=1) * 51
+        self.file.write(palette.astype(np.uint8).tobytes())
+        self.file.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever
+        self.size = size
+        self.pending = None
+
+    def _flush(self, delay_cs):
+        data = self.pending
+        w, h = self.size
+        self.file.write(b"\x21\xF9\x04\x00" + max(1, delay_cs).to_bytes(2, "little") + b"\x00\x00")
+        self.file.write(b"\x2C\0\0\0\0" + w.to_bytes(2, "little") + h.to_bytes(2, "little") + b"\x00\x08")
+        for i in range(0, len(data), 255):
+            chunk = data[i:i + 255]
+            self.file.write(bytes([len(chunk)]) + chunk)
+        self.file.write(b"\x00")
+
+    def write(self, rgb, frame, delay):
+        if self.pending is not None:
+            self._flush(delay)
+        levels = (rgb.astype(np.uint16) + 25) // 51
+        index = levels[..., 0] * 36 + levels[..., 1] * 6 + levels[..., 2]
+        self.pending = _lzw(index.astype(np.uint8).tobytes())
+
+    def close(self):
+        if self.pending is not None:
+            self._flush(4)
+        self.file.write(b"\x3B")
+        self.file.close()
+
+
+WRITERS = {"raw": RawWriter, "png": PngWriter, "gif": GifWriter}
+
+
+def scaled_size(size, scale):
+    """Size of the frames written for a `size` screen keeping every `scale`th pixel."""
+    w, h = size
+    return len(range(0, w, scale)), len(range(0, h, scale))
+
+
+def _worker(conn, shm_name, slots, size, shifts, fmt, path, scale):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    w, h = size
+    ring = np.ndarray((slots, h, w), np.uint32, buffer=shm.buf)
+    writer = WRITERS[fmt](path, scaled_size(size, scale))
+    last_ns = None
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            slot, frame, grabbed_ns = message
+            start = time.perf_counter_ns()
+            pixels = ring[slot, ::scale, ::scale]
+            rgb = np.empty(pixels.shape + (3,), np.uint8)
+            for channel, shift in enumerate(shifts[:3]):
+                rgb[..., channel] = pixels >> shift
+            conn.send((slot, None))  # the slot is free as soon as it is converted
+            delay = 4 if last_ns is None else round((grabbed_ns - last_ns) / 1e7)
+            last_ns = grabbed_ns
+            writer.write(rgb, frame, delay)
+            conn.send((None, time.perf_counter_ns() - start))
+    finally:
+        writer.close()
+        del ring
+        shm.close()
+
+
+# --- Game side ---
+class Capture:
+    def __init__(self, path, size, shifts, slots=8, fps=60, every=1, scale=1):
+        self.path = path
+        self.format = _format(path)
+        self.size = size
+        self.out_size = scaled_size(size, scale)  # what the encoder writes
+        self.fps = fps
+        self.every = every
+        w, h = size
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * w * h * 4)
+        self.ring = np.ndarray((slots, h, w), np.uint32, buffer=self.shm.buf)
+        self.ring.fill(0)  # fault the pages in now rather than on the first grabs
+        self.free = list(range(slots))
+        self.conn, child = mp.Pipe()
+        self.proc = mp.Process(target=_worker, args=(child, self.shm.name, slots, size, shifts, self.format, path,
+                                                     scale), daemon=True)
+        self.proc.start()
+        # Stats
+        self.frame = 0
+        self.grabbed = 0
+        self.dropped = 0
+        self.encoded = 0
+        self.grab_ns = 0
+        self.grab_max_ns = 0
+        self.encode_ns = 0
+
+    def _collect(self):
+        conn = self.conn
+        while conn.poll():
+            try:
+                slot, encode_ns = conn.recv()
+            except EOFError:  # the encoder has exited
+                break
+            if slot is not None:
+                self.free.append(slot)
+            else:
+                self.encoded += 1
+                self.encode_ns += encode_ns
+
+    def grab(self, screen):
+        """Copy `screen` into the ring for encoding, or drop the frame if the ring is full."""
+        self.frame += 1
+        if self.frame % self.every:
+            return
+        start = time.perf_counter_ns()
+        self._collect()
+        if self.free:
+            slot = self.free.pop()
+            # get_view("2") is the pixel memory itself, x-major; transposed it
+            # matches the ring's rows, so this is a straight copy.
+            np.copyto(self.ring[slot], np.asarray(screen.get_view("2")).T)
+            self.conn.send((slot, self.frame, start))
+            self.grabbed += 1
+        else:
+            self.dropped += 1
+        ns = time.perf_counter_ns() - start
+        self.grab_ns += ns
+        if ns > self.grab_max_ns:
+            self.grab_max_ns = ns
+
+    def close(self):
+        """Finish encoding what was grabbed and return a one-line report."""
+        if self.proc is None:
+            return ""
+        self.conn.send(None)
+        self.proc.join()
+        self._collect()
+        self.proc = None
+        del self.ring
+        self.shm.close()
+        self.shm.unlink()
+        attempts = max(1, self.grabbed + self.dropped)
+        report = (f"capture {self.path}: {self.grabbed} frames ({self.dropped} dropped), "
+                  f"grab {self.grab_ns / attempts / 1000:.0f} us mean, {self.grab_max_ns / 1000:.0f} us max, "
+                  f"encode {self.encode_ns / max(1, self.encoded) / 1e6:.1f} ms/frame")
+        if self.format == "raw":
+            w, h = self.out_size
+            report += f"\n  ffmpeg -f rawvideo -pix_fmt rgb24 -s {w}x{h} -r {self.fps / self.every:g} -i {self.path} out.mp4"
+        return report
+
+
+def from_args(args, screen):
+    if not args.capture:
+        return None
+    if screen.get_bytesize() != 4:
+        raise SystemExit("--capture needs a 32-bit display surface")
+    fps = args.fps if args.fps > 0 else 60
+    return Capture(args.capture, screen.get_size(), screen.get_shifts(), fps=fps, every=args.capture_every,
+                   scale=args.capture_scale)
+
+
+def positive(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more, got {value}")
+    return value
+
+
+def add_arguments(parser):
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record gameplay: a .gif, a raw .rgb video, or a directory of PNGs")
+    parser.add_argument("--capture-every", type=positive, default=1, metavar="N", help="capture every Nth frame")
+    parser.add_argument("--capture-scale", type=positive, default=1, metavar="N",
+                        help="keep every Nth pixel in each direction (use 2 or more for GIFs)")
+    return parser
+
+
+# --- Benchmark ---
+def benchmark(frames=120):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import tempfile
+    pygame.init()
+    screen = pygame.display.set_mode((800, 400))
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, scale in (("clip.rgb", 1), ("frames", 1), ("clip.gif", 2)):
+            capture = Capture(os.path.join(tmp, name), screen.get_size(), screen.get_shifts(), scale=scale)
+            for i in range(frames):
+                screen.fill(((i * 3) % 256, 80, 160))
+                pygame.draw.circle(screen, (255, 255, 0), (i * 6 % 800, 200), 40)
+                capture.grab(screen)
+                time.sleep(1 / 60)
+            print(capture.close())
+    pygame.quit()
+
+
+def check_raw_hint(frames=5, scale=3):
+    """A scaled raw capture's ffmpeg hint gives the size of the frames actually written."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import tempfile
+    pygame.init()
+    screen = pygame.display.set_mode((800, 400))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clip.rgb")
+        capture = Capture(path, screen.get_size(), screen.get_shifts(), scale=scale)
+        for _ in range(frames):
+            capture.grab(screen)
+            time.sleep(1 / 60)
+        report = capture.close()
+        w, h = scaled_size(screen.get_size(), scale)
+        assert f"-s {w}x{h} " in report, report
+        assert os.path.getsize(path) == capture.grabbed * w * h * 3
+    pygame.quit()
+    print(f"raw hint at scale {scale}: -s {w}x{h}, matches the file")
+
+
+if __name__ == "__main__":
+    check_raw_hint()
+    benchmark()
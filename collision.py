@@ -0,0 +1,105 @@
+"""Obstacle collision: an x-sorted broad phase and an optional mask narrow phase.
+
+simulation.py keeps obstacles in spawn order, which is also x order: every
+obstacle moves left at the same speed, and a new one spawns at least
+41 frames x 3 px = 123 px after the previous spawn, further than the 120 px
+maximum pair offset. candidates() uses that to look only at the obstacles
+under the player's column and stop at the first one past it.
+
+Spikes are triangles. With a MaskCache, hits() checks them against a
+triangle mask cached per spike size, so they no longer collide like full
+rectangles. Firewalls fill their rect and need no mask.
+
+Run `python collision.py` to benchmark against testing every obstacle.
+"""
+import time
+
+import pygame
+
+from entities import FIREWALL, SPIKE, Obstacle
+
+
+def candidates(obstacles, hitbox):
+    """Yield obstacles whose x-span overlaps the hitbox; `obstacles` must be x-sorted."""
+    left, right = hitbox.x, hitbox.x + hitbox.width
+    for obstacle in obstacles:
+        rect = obstacle.rect
+        if rect.x >= right:
+            break
+        if rect.x + rect.width > left:
+            yield obstacle
+
+
+class MaskCache:
+    def __init__(self):
+        self.masks = {}
+
+    def spike(self, width, height):
+        key = (width, height)
+        mask = self.masks.get(key)
+        if mask is None:
+            surf = pygame.Surface((width, height))
+            surf.set_colorkey((0, 0, 0))
+            pygame.draw.polygon(surf, (255, 255, 255), [(0, height), (width // 2, 0), (width, height)])
+            mask = self.masks[key] = pygame.mask.from_surface(surf)
+        return mask
+
+    def box(self, width, height):
+        key = ("box", width, height)
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = self.masks[key] = pygame.mask.Mask((width, height), fill=True)
+        return mask
+
+
+def hits(hitbox, obstacle, masks=None):
+    rect = obstacle.rect
+    if not hitbox.colliderect(rect):
+        return False
+    if masks is None or obstacle.kind != SPIKE:
+        return True
+    spike = masks.spike(rect.width, rect.height)
+    return spike.overlap(masks.box(hitbox.width, hitbox.height), (hitbox.x - rect.x, hitbox.y - rect.y)) is not None
+
+
+def add_arguments(parser):
+    parser.add_argument("--pixel-collisions", action="store_true",
+                        help="collide with spikes as triangles instead of their bounding rects")
+    return parser
+
+
+# --- Benchmark ---
+def benchmark(counts=(100, 300, 1000), rounds=2000):
+    hitbox = pygame.Rect(55, 285, 40, 15)
+    results = {}
+    for count in counts:
+        # Evenly spaced obstacles sweeping past the player, in x order.
+        obstacles = [Obstacle(pygame.Rect(-60 + i * 12, 240, 50, 160), SPIKE if i % 2 else FIREWALL)
+                     for i in range(count)]
+        masks = MaskCache()
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for obstacle in obstacles:
+                pygame.Rect(hitbox.x, hitbox.y, 40, 15).colliderect(obstacle.rect)
+        naive = (time.perf_counter() - start) / rounds * 1e6
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for obstacle in candidates(obstacles, hitbox):
+                hits(hitbox, obstacle)
+        broad = (time.perf_counter() - start) / rounds * 1e6
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for obstacle in candidates(obstacles, hitbox):
+                hits(hitbox, obstacle, masks)
+        narrow = (time.perf_counter() - start) / rounds * 1e6
+        results[count] = (naive, broad, narrow)
+    return results
+
+
+if __name__ == "__main__":
+    for count, (naive, broad, narrow) in benchmark().items():
+        print(f"{count:>5} obstacles: test all {naive:8.1f} us, broad phase {broad:6.1f} us, "
+              f"broad + masks {narrow:6.1f} us per frame")
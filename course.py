@@ -0,0 +1,296 @@
+"""Seeded obstacle courses for simulation.GameState, generated ahead of play.
+
+Without a course, step() rolls for every spawn inside the tick from a
+spawn timer. With one, stream() lays the level out as clusters of
+obstacles with gaps between them, and Course keeps the next LOOKAHEAD
+seconds of it queued, so step() only pops what has come into view.
+Positions are in scroll distance (pixels the obstacles have moved), not
+frames: speed depends on score and powerups, so a distance schedule is
+what gives every player with the same seed the same course.
+
+Every cluster is clearable and every gap is wide enough to land in.
+Jumps records the player's real flights through step(), a single jump and
+a double jump pressed at each tick of it. A cluster is only emitted if some
+flight keeps the hitbox above it for as long as it takes to pass at the
+slowest speed a slowdown allows, and the shortest such flight is the one it
+is spaced for. Taking off as late as that flight allows, the player lands
+its time above plus its fall after reaching the cluster, so that much
+(plus the next flight's rise) separates the fronts of neighbouring
+clusters at the fastest speed the player can have reached by then. Spikes
+count as high as their wobble can lift them. Nothing is promised to a
+player who runs out of invincibility inside a cluster.
+
+Run `python course.py` to check generated clusters against the simulation
+and compare autopilot runs with and without a course.
+"""
+import collections
+import math
+import random
+import statistics
+import time
+
+import pygame
+
+import simulation as sim
+from entities import SPIKE, SCORE_BOOST, Obstacle, Powerup
+
+LOOKAHEAD = 3  # seconds of course kept queued at the fastest speed
+HITBOX_WIDTH = 40
+MIN_SPEED = sim.SLOWDOWN_MIN_SPEED
+MARGIN = 2  # ticks lost to rounding when taking off
+MAX_SPEED = (sim.OBSTACLE_SPEED + (sim.SPAWN_INTERVAL - sim.MIN_SPAWN_INTERVAL) // sim.SPAWN_INTERVAL_STEP
+             * sim.SPEED_STEP)
+START = sim.SPAWN_INTERVAL * sim.OBSTACLE_SPEED  # where the first cluster starts, as without a course
+POWERUP_EVERY = sim.POWERUP_INTERVAL * sim.OBSTACLE_SPEED
+CLUSTER_SIZES = ((1, 2, 3), (6, 3, 1))  # obstacles per cluster, and their weights
+CLUSTER_OFFSETS = (50, 120)  # between neighbours in a cluster, as the old pairs
+SLACK = (350, 60)  # extra gap, shrinking from the first to the second over the course
+SLACK_DECAY = 0.01  # px of slack lost per px of course
+
+
+def wobble_reach(frames=1000):
+    """Most a spike rises above its spawn height: step() adds the rounded wobble to its rect every tick."""
+    rect = pygame.Rect(0, 1000, 1, 1)
+    highest = reach = 0
+    for frame in range(frames):
+        rect.y += math.sin(sim.pulse_phase(frame)) * 2
+        highest = max(highest, rect.y)
+        reach = max(reach, highest - rect.y)
+    return reach
+
+
+class Jumps:
+    """What the player's jumps can clear, measured with step()."""
+
+    def __init__(self):
+        single = self._flight(None)
+        self.flights = [single] + [self._flight(tick) for tick in range(1, len(single))]
+        self.spike_reach = wobble_reach()
+        self.cache = {}
+
+    @staticmethod
+    def _flight(second):
+        """Hitbox bottom per tick from takeoff to landing, pressing again `second` ticks in."""
+        state = sim.GameState(0)
+        sim.press_jump(state)
+        sim.step(state)
+        bottoms = []
+        inputs = sim.Inputs(jump_pressed=True)
+        while True:
+            sim.step(state, inputs)
+            bottoms.append(state.player_hitbox().bottom)
+            if state.on_ground():
+                return bottoms
+            inputs = sim.Inputs(jump_pressed=len(bottoms) == second)
+
+    def flight(self, height, ticks):
+        """(rise, run, fall, second press) of the shortest flight that keeps the hitbox
+        above `height` for `ticks` in a row, or None: `rise` ticks from takeoff to
+        getting there, `run` ticks there, `fall` ticks from then to landing."""
+        key = (height, ticks)
+        if key not in self.cache:
+            top = sim.HEIGHT - height
+            best = None
+            for second, bottoms in enumerate(self.flights):
+                start = None
+                for tick, bottom in enumerate(bottoms + [top + 1]):
+                    if bottom <= top:
+                        if start is None:
+                            start = tick
+                        continue
+                    if start is not None and tick - start >= ticks:
+                        found = (start, tick - start, len(bottoms) - tick, second or None)
+                        if best is None or (len(bottoms), found[1] + found[2]) < (sum(best[:3]), best[1] + best[2]):
+                            best = found
+                        break
+                    start = None
+            self.cache[key] = best
+        return self.cache[key]
+
+    def height(self, kind, height):
+        return height + self.spike_reach if kind == SPIKE else height
+
+    def ticks(self, span):
+        """Ticks `span` px of obstacles overlap the hitbox at the slowest speed."""
+        return math.ceil((span + HITBOX_WIDTH) / MIN_SPEED) + 1
+
+    def clears(self, span, height):
+        return self.flight(height, self.ticks(span)) is not None
+
+    def spacing(self, before, after, speed):
+        """Least distance (px) between the fronts of clusters flown with flights `before` and `after`."""
+        return speed * (before[1] + before[2] + after[0] + MARGIN)
+
+
+def cluster(rng, jumps):
+    """[(offset, kind, height)] that one flight clears; returns it with that flight."""
+    kind = rng.choice(sim.OBSTACLE_TYPES)
+    count = rng.choices(*CLUSTER_SIZES)[0]
+    obstacles, offset, highest = [], 0, 0
+    for _ in range(count):
+        height = rng.randint(*sim.OBSTACLE_HEIGHTS[kind])
+        tallest = max(highest, jumps.height(kind, height))
+        if obstacles and not jumps.clears(offset + sim.OBSTACLE_WIDTH, tallest):
+            break
+        obstacles.append((offset, kind, height))
+        highest = tallest
+        offset += rng.randint(*CLUSTER_OFFSETS)
+    return obstacles, jumps.flight(highest, jumps.ticks(obstacles[-1][0] + sim.OBSTACLE_WIDTH))
+
+
+def stream(seed, jumps):
+    """Yield (distance, is_powerup, kind, height or y) forever, in distance order."""
+    rng = random.Random(f"{seed}:course")
+    start = START
+    score = 0  # the most the score can be once everything so far has gone by
+    next_powerup = POWERUP_EVERY
+    previous = None
+    while True:
+        obstacles, flight = cluster(rng, jumps)
+        if previous is not None:
+            speed = min(MAX_SPEED, sim.OBSTACLE_SPEED + score // sim.SPEEDUP_EVERY * sim.SPEED_STEP)
+            slack = max(SLACK[1], SLACK[0] - start * SLACK_DECAY)
+            start += jumps.spacing(previous, flight, speed) + rng.uniform(0.5, 1) * slack
+        start = round(start)
+        for offset, kind, height in obstacles:
+            yield start + offset, False, kind, height
+        score += len(obstacles)
+        previous = flight
+        end = start + obstacles[-1][0] + sim.OBSTACLE_WIDTH
+        if end >= next_powerup:
+            kind = rng.choice(sim.POWERUP_TYPES)
+            yield end, True, kind, rng.randint(150, 250)
+            score += 5 * (kind == SCORE_BOOST)
+            next_powerup = end + POWERUP_EVERY
+
+
+_jumps = None
+
+
+class Course:
+    """The course for `seed`, restarted with every run (GameState.reset() calls restart())."""
+
+    def __init__(self, seed, jumps=None):
+        global _jumps
+        if jumps is None:
+            jumps = _jumps = _jumps or Jumps()
+        self.seed = seed
+        self.jumps = jumps
+        self.lookahead = LOOKAHEAD * sim.FPS * MAX_SPEED
+        self.restart()
+
+    def restart(self):
+        self.entries = stream(self.seed, self.jumps)
+        self.queue = collections.deque()
+        self.distance = 0.0
+        self.generated = 0
+
+    def _fill(self, until):
+        queue, entries = self.queue, self.entries
+        while not queue or queue[-1][0] < until:
+            queue.append(next(entries))
+            self.generated += 1
+
+    def spawn(self, state):
+        """Add everything that comes into view this tick to `state`'s obstacles and powerups."""
+        end = self.distance + state.obstacle_speed
+        queue = self.queue
+        if not queue or queue[-1][0] < end + self.lookahead:
+            self._fill(end + self.lookahead)
+        while queue[0][0] < end:
+            distance, is_powerup, kind, value = queue.popleft()
+            if is_powerup:
+                state.powerups.append(Powerup(pygame.Rect(sim.WIDTH, value, sim.POWERUP_SIZE, sim.POWERUP_SIZE), kind))
+            else:
+                # Placed where it would be had it entered exactly at `distance`;
+                # this tick's move then brings it on screen.
+                x = round(sim.WIDTH + distance - self.distance)
+                state.obstacles.append(Obstacle(pygame.Rect(x, sim.HEIGHT - value, sim.OBSTACLE_WIDTH, value), kind))
+        self.distance = end
+
+
+def add_arguments(parser):
+    parser.add_argument("--course", action="store_true",
+                        help="play the seeded course: the same obstacles for every run with the same --seed")
+    return parser
+
+
+# --- Self-check and benchmark ---
+def check(jumps, pairs=300, seed=0):
+    """Fly pairs of generated clusters, spaced as tightly as stream() may, at both
+    speed limits with step(); count the pairs the player doesn't get through."""
+    rng = random.Random(seed)
+    failures = 0
+    following = cluster(rng, jumps)
+    for _ in range(pairs):
+        first, following = following, cluster(rng, jumps)
+        if not all(_flies(jumps, (first, following), speed) for speed in (MIN_SPEED, MAX_SPEED)):
+            failures += 1
+    return failures
+
+
+def _flies(jumps, clusters, speed):
+    # Each cluster is flown with its flight, taking off as late as that flight
+    # allows: when the front is `rise` ticks (plus the one being stepped) away.
+    state = sim.GameState(0)
+    sim.press_jump(state)
+    state.obstacle_speed = speed
+    state.spawn_interval = sim.MIN_SPAWN_INTERVAL  # no speedups
+    state.spawn_timer = -10**6  # nothing else spawns
+    hitbox_right = sim.PLAYER_X + 5 + HITBOX_WIDTH
+    front = hitbox_right + speed * 100
+    groups = []
+    for i, (obstacles, flight) in enumerate(clusters):
+        if i:
+            front += jumps.spacing(clusters[i - 1][1], flight, speed)
+        # Kind -1 doesn't wobble: the highest a spike gets is already in its height.
+        top = sim.HEIGHT - max(jumps.height(kind, h) for _, kind, h in obstacles)
+        group = [Obstacle(pygame.Rect(round(front + offset), top, sim.OBSTACLE_WIDTH, sim.HEIGHT - top), -1)
+                 for offset, _, _ in obstacles]
+        state.obstacles += group
+        groups.append((group, flight))
+    second_at = None
+    for tick in range(2000):
+        press = tick == second_at
+        if groups and groups[0][0][0].rect.x - hitbox_right <= speed * (groups[0][1][0] + 1):
+            group, (_, _, _, second) = groups.pop(0)
+            if not state.on_ground():
+                return False
+            press = True
+            second_at = second and tick + second
+        sim.step(state, sim.Inputs(jump_pressed=press))
+        if state.game_over:
+            return False
+        if not groups and state.obstacles[-1].rect.right < sim.PLAYER_X + 5:
+            return True
+    return False
+
+
+def autopilot_scores(seeds, course, max_frames=20000):
+    scores = []
+    for seed in seeds:
+        state = sim.GameState(seed, course=Course(seed) if course else None)
+        sim.press_jump(state)
+        sim.run(state, sim.autopilot, max_frames)
+        scores.append(state.score)
+    return scores
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    jumps = Jumps()
+    print(f"jump table in {(time.perf_counter() - start) * 1000:.0f} ms: spikes rise up to {jumps.spike_reach} px, "
+          f"{len(jumps.flights)} flights of {len(jumps.flights[0])} to {max(map(len, jumps.flights))} ticks")
+    start = time.perf_counter()
+    print(f"{check(jumps, 200)} of 200 tightest-spaced cluster pairs not flown through in the simulation "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    course = Course(1, jumps)
+    start = time.perf_counter()
+    course._fill(200_000)
+    per_entry = (time.perf_counter() - start) / course.generated * 1e6
+    print(f"{course.generated} entries for 200,000 px of course, {per_entry:.1f} us each")
+    for mode in (False, True):
+        scores = autopilot_scores(range(50), mode)
+        print(f"autopilot over 50 seeds {'with' if mode else 'without'} a course: "
+              f"mean score {statistics.mean(scores):.2f}, best {max(scores)}")
@@ -0,0 +1,83 @@
+"""Dirty-rectangle presentation: push only the screen regions that changed.
+
+Draw code reports every rect it touches with add() after erase() has put the
+background back under last frame's sprites. present() then updates
+those rects plus the ones drawn last frame (so stale sprites get erased),
+flips the whole screen when add_full() was called, and presents nothing at
+all when nothing was drawn. With enabled=False it always flips, like the
+plain pygame.display.flip() loop.
+"""
+import pygame
+
+
+class DirtyRenderer:
+    def __init__(self, screen, enabled=True):
+        self.screen = screen
+        self.enabled = enabled
+        self.screen_rect = screen.get_rect()
+        self.full_pixels = self.screen_rect.width * self.screen_rect.height
+        self.rects = []
+        self.prev_rects = []
+        self.full = True
+        # Stats: pixels pushed by the latest present() and running totals.
+        self.pixels = 0
+        self.total_pixels = 0
+        self.frames = 0
+        self.skipped = 0
+
+    def add(self, rect):
+        if self.enabled and rect:
+            rect = self.screen_rect.clip(rect)
+            if rect:
+                self.rects.append(rect)
+        return rect
+
+    def add_full(self):
+        self.full = True
+
+    def erase(self, background):
+        """Copy `background` back over last frame's rects, or over the whole
+        screen when this frame is a full one anyway."""
+        if not self.enabled or self.full:
+            self.screen.blit(background, (0, 0))
+        else:
+            for rect in self.prev_rects:
+                self.screen.blit(background, rect, rect)
+
+    def skip(self):
+        """Nothing changed this frame: keep what is on screen."""
+        self.frames += 1
+        self.skipped += 1
+        self.pixels = 0
+
+    def present(self):
+        if not self.enabled or self.full:
+            pygame.display.flip()
+            self.pixels = self.full_pixels
+        else:
+            rects = self.prev_rects + self.rects
+            if rects:
+                pygame.display.update(rects)
+            self.pixels = sum(r.width * r.height for r in rects)
+            if not rects:
+                self.skipped += 1
+        self.prev_rects = self.rects
+        self.rects = []
+        self.full = False
+        self.frames += 1
+        self.total_pixels += self.pixels
+
+    def summary(self):
+        frames = max(1, self.frames)
+        average = self.total_pixels / frames
+        return (f"dirty rects: {average:,.0f} px/frame on average "
+                f"({average / self.full_pixels:.1%} of a full flip), {self.skipped}/{self.frames} frames not presented")
+
+
+def add_arguments(parser, static_background=True):
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="present only changed screen regions and report pixels pushed per frame")
+    if static_background:
+        parser.add_argument("--static-background", action="store_true",
+                            help="hold the background still so gameplay frames only push moving sprites")
+    return parser
@@ -0,0 +1,114 @@
+"""Obstacle and powerup records shared by main.py and rialo_runner.py.
+
+Entities are small __slots__ classes with integer kind tags instead of dicts
+keyed by strings, so per-frame code compares ints and indexes lookup tables
+(see kind_table()) instead of chaining string comparisons. The runner's
+swaying obstacles read a shared precomputed sine table with a fixed-point
+phase instead of calling math.sin() every tick.
+
+Run `python entities.py` to compare memory and update cost with dicts.
+"""
+import math
+import time
+import tracemalloc
+
+import pygame
+
+# --- Obstacle kinds ---
+FIREWALL, SPIKE = 0, 1
+OBSTACLE_NAMES = ("firewall", "spike")
+
+# --- Powerup kinds: main.py uses the first three, rialo_runner.py the last two ---
+SCORE_BOOST, SLOWDOWN, INVINCIBLE, SHIELD, DOUBLE_SCORE = range(5)
+POWERUP_NAMES = ("score_boost", "slowdown", "invincible", "shield", "double_score")
+
+# --- Move patterns ---
+STILL, HORIZONTAL, VERTICAL = 0, 1, 2
+
+# One cycle of sin(), indexed by a fixed-point phase: SINE_STEPS steps per cycle.
+SINE_STEPS = 1024
+SINE = [math.sin(2 * math.pi * i / SINE_STEPS) for i in range(SINE_STEPS)]
+
+
+def kind_table(mapping, default=None):
+    """List indexed by kind tag, for per-kind colours, labels and so on."""
+    table = [default] * (max(mapping) + 1)
+    for kind, value in mapping.items():
+        table[kind] = value
+    return table
+
+
+class Obstacle:
+    __slots__ = ("rect", "kind", "move", "amplitude", "step", "phase")
+
+    def __init__(self, rect, kind, move=STILL, amplitude=0, speed=0.0):
+        self.rect = rect
+        self.kind = kind
+        self.move = move
+        self.amplitude = amplitude
+        self.step = round(speed * SINE_STEPS)  # `speed` is in cycles per tick
+        self.phase = 0
+
+    def sway(self):
+        """Advance the move pattern one tick; returns amplitude * sin(2*pi*cycles)."""
+        self.phase = (self.phase + self.step) % SINE_STEPS
+        return self.amplitude * SINE[self.phase]
+
+
+class Powerup:
+    __slots__ = ("rect", "kind")
+
+    def __init__(self, rect, kind):
+        self.rect = rect
+        self.kind = kind
+
+
+# --- Benchmark ---
+def _measure(make, count=1000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [make(i) for i in range(count)]
+    size = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+    return items, size
+
+
+def benchmark(count=1000, rounds=200):
+    def as_dict(i):
+        return {"rect": pygame.Rect(800, 300, 50, 100), "type": "spike" if i % 2 else "firewall",
+                "move": {"type": "vertical" if i % 2 else "horizontal", "amplitude": 10, "speed": 0.05},
+                "move_counter": 0}
+
+    def as_record(i):
+        return Obstacle(pygame.Rect(800, 300, 50, 100), i % 2, VERTICAL if i % 2 else HORIZONTAL, 10, 0.05)
+
+    dicts, dict_size = _measure(as_dict, count)
+    records, record_size = _measure(as_record, count)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for o in dicts:
+            move = o["move"]
+            o["move_counter"] += move["speed"]
+            offset = math.sin(o["move_counter"] * 2 * math.pi) * move["amplitude"]
+            if move["type"] == "vertical":
+                o["rect"].y = 300 + offset
+            elif move["type"] == "horizontal":
+                o["rect"].x += offset
+    dict_time = (time.perf_counter() - start) / rounds / count * 1e9
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for o in records:
+            if o.move == VERTICAL:
+                o.rect.y = 300 + o.sway()
+            elif o.move == HORIZONTAL:
+                o.rect.x += o.sway()
+    record_time = (time.perf_counter() - start) / rounds / count * 1e9
+    return (dict_size, dict_time), (record_size, record_time)
+
+
+if __name__ == "__main__":
+    (dict_size, dict_time), (record_size, record_time) = benchmark()
+    print(f"dict obstacles:    {dict_size:6.0f} bytes each, {dict_time:5.0f} ns per update")
+    print(f"slotted obstacles: {record_size:6.0f} bytes each, {record_time:5.0f} ns per update")
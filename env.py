@@ -0,0 +1,214 @@
+"""Gym-style training environment on top of simulation.py, plus a process-pool
+vectorized runner.
+
+JumperEnv follows the Gymnasium API (reset() -> (obs, info), step(action)
+-> (obs, reward, terminated, truncated, info)) without depending on it. It
+runs the real game rules, so gravity, jump strength, the jump cut and the
+double jump are the game's. The reward is the score gained this step; an
+episode terminates on a collision and is truncated after `max_steps`.
+
+Actions: NOOP, PRESS (SPACE down) and RELEASE (SPACE up, which cuts a rising
+jump). Observations are OBS_SIZE float32 values, see observe().
+
+VecEnv spreads environments over worker processes. Actions, observations,
+rewards and done flags live in shared-memory NumPy arrays, so a step sends
+one short message per worker and copies no observations between processes.
+Environments reset automatically when they finish; the observation returned
+for them is the first one of the next episode.
+
+Run `python env.py` to measure steps per second for 1..N workers.
+"""
+import multiprocessing as mp
+import os
+import random
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import simulation as sim
+from entities import FIREWALL
+
+NOOP, PRESS, RELEASE = 0, 1, 2
+N_ACTIONS = 3
+LOOKAHEAD = 3  # obstacles described in each observation
+OBS_SIZE = 5 + 3 * LOOKAHEAD + 2
+MAX_STEPS = 10_000
+ACTION_INPUTS = (sim.NO_INPUT, sim.Inputs(jump_pressed=True), sim.Inputs(jump_released=True))
+
+
+def observe(state, out):
+    """Fill `out` (OBS_SIZE floats) from `state`, all roughly in 0..1:
+
+    height above ground, vertical velocity / 12, jumps left / 2, obstacle
+    speed / 10, invincible; then for the next LOOKAHEAD obstacles ahead of
+    the hitbox: distance / WIDTH, top / HEIGHT, 1 for a firewall (distance
+    and top 1.0 and kind 0 for a missing one); then the nearest powerup's
+    distance / WIDTH and y / HEIGHT (1.0 when there is none).
+    """
+    rect = state.player_rect
+    out[0] = (sim.GROUND_Y - rect.y) / sim.GROUND_Y
+    out[1] = state.player_velocity / -sim.JUMP_STRENGTH
+    out[2] = state.jumps_left / sim.MAX_JUMPS
+    out[3] = state.obstacle_speed / 10
+    out[4] = state.invincible
+    left = rect.x + 5
+    i = 5
+    for obstacle in state.obstacles:
+        o = obstacle.rect
+        if o.x + o.width <= left:
+            continue
+        out[i] = (o.x - left) / sim.WIDTH
+        out[i + 1] = o.y / sim.HEIGHT
+        out[i + 2] = obstacle.kind == FIREWALL
+        i += 3
+        if i == 5 + 3 * LOOKAHEAD:
+            break
+    while i < 5 + 3 * LOOKAHEAD:
+        out[i] = out[i + 1] = 1.0
+        out[i + 2] = 0.0
+        i += 3
+    out[i] = out[i + 1] = 1.0
+    for p in state.powerups:
+        if p.rect.right > left:
+            out[i] = (p.rect.x - left) / sim.WIDTH
+            out[i + 1] = p.rect.y / sim.HEIGHT
+            break
+    return out
+
+
+class JumperEnv:
+    def __init__(self, max_steps=MAX_STEPS, pixel_collisions=False):
+        self.max_steps = max_steps
+        self.pixel_collisions = pixel_collisions
+        self.seeds = random.Random()
+        self.state = None
+        self.steps = 0
+
+    def reset(self, seed=None, out=None):
+        if seed is not None:
+            self.seeds.seed(seed)
+        self.state = sim.GameState(self.seeds.getrandbits(32), pixel_collisions=self.pixel_collisions)
+        sim.press_jump(self.state)  # leave the start screen
+        self.steps = 0
+        obs = observe(self.state, np.empty(OBS_SIZE, np.float32) if out is None else out)
+        return obs, {}
+
+    def step(self, action, out=None):
+        state = self.state
+        score = state.score
+        sim.step(state, ACTION_INPUTS[action])
+        self.steps += 1
+        obs = observe(state, np.empty(OBS_SIZE, np.float32) if out is None else out)
+        return obs, float(state.score - score), state.game_over, self.steps >= self.max_steps, {"score": state.score}
+
+
+# --- Vectorized runner ---
+def _worker(conn, names, n_envs, lo, hi, seed, max_steps):
+    shms = [shared_memory.SharedMemory(name=name) for name in names]
+    obs, actions, rewards, terminated, truncated = _views(shms, n_envs)
+    envs = [JumperEnv(max_steps) for _ in range(lo, hi)]
+    try:
+        while True:
+            cmd = conn.recv()
+            if cmd == "step":
+                for i, env in zip(range(lo, hi), envs):
+                    _, reward, term, trunc, _ = env.step(actions[i], obs[i])
+                    rewards[i], terminated[i], truncated[i] = reward, term, trunc
+                    if term or trunc:
+                        env.reset(out=obs[i])
+            elif cmd == "reset":
+                for i, env in zip(range(lo, hi), envs):
+                    env.reset(seed=None if seed is None else seed + i, out=obs[i])
+            else:
+                break
+            conn.send(None)
+    finally:
+        del obs, actions, rewards, terminated, truncated
+        for shm in shms:
+            shm.close()
+
+
+_LAYOUT = ((np.float32, (OBS_SIZE,)), (np.int8, ()), (np.float32, ()), (np.bool_, ()), (np.bool_, ()))
+
+
+def _views(shms, n_envs):
+    return [np.ndarray((n_envs,) + shape, dtype, buffer=shm.buf) for shm, (dtype, shape) in zip(shms, _LAYOUT)]
+
+
+class VecEnv:
+    """n_envs environments on `workers` processes. step() and reset() return
+    views of the shared buffers; copy them to keep them past the next call."""
+
+    def __init__(self, n_envs, workers=None, seed=None, max_steps=MAX_STEPS):
+        workers = max(1, min(n_envs, workers or os.cpu_count() or 1))
+        self.n_envs = n_envs
+        self.shms = [shared_memory.SharedMemory(create=True, size=max(1, n_envs * np.dtype(dtype).itemsize * int(np.prod(shape))))
+                     for dtype, shape in _LAYOUT]
+        self.obs, self.actions, self.rewards, self.terminated, self.truncated = _views(self.shms, n_envs)
+        bounds = np.linspace(0, n_envs, workers + 1).astype(int)
+        self.conns, self.procs = [], []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_worker, args=(child, [s.name for s in self.shms], n_envs, lo, hi, seed, max_steps),
+                              daemon=True)
+            proc.start()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def _broadcast(self, cmd):
+        for conn in self.conns:
+            conn.send(cmd)
+        for conn in self.conns:
+            conn.recv()
+
+    def reset(self):
+        self._broadcast("reset")
+        return self.obs
+
+    def step(self, actions):
+        self.actions[:] = actions
+        self._broadcast("step")
+        return self.obs, self.rewards, self.terminated, self.truncated
+
+    def close(self):
+        if not self.procs:
+            return
+        for conn in self.conns:
+            conn.send("close")
+        for proc in self.procs:
+            proc.join()
+        self.procs = []
+        del self.obs, self.actions, self.rewards, self.terminated, self.truncated
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Benchmark ---
+def benchmark(n_envs=64, steps=500, worker_counts=None):
+    rng = np.random.default_rng(0)
+    actions = rng.choice(N_ACTIONS, size=(steps, n_envs), p=[0.9, 0.05, 0.05]).astype(np.int8)
+    results = {}
+    for workers in worker_counts or sorted({1, os.cpu_count() or 1}):
+        with VecEnv(n_envs, workers, seed=0) as venv:
+            venv.reset()
+            start = time.perf_counter()
+            episodes = 0
+            for t in range(steps):
+                _, _, terminated, truncated = venv.step(actions[t])
+                episodes += int(terminated.sum() + truncated.sum())
+            results[workers] = (n_envs * steps / (time.perf_counter() - start), episodes)
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{os.cpu_count()} CPUs")
+    for workers, (rate, episodes) in benchmark().items():
+        print(f"{workers:>3} workers: {rate:10,.0f} env-steps/s ({episodes} episodes finished)")
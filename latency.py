@@ -0,0 +1,215 @@
+"""Late-latched, timestamped jump input for main.py, and input-to-present latency.
+
+Every key event is stamped with the time it was polled. Presses and
+releases are queued rather than folded into one Inputs for the frame, and
+feed() hands each simulation tick the ones that happened before that tick's
+slice of real time. A frame that catches up several ticks spreads its input
+over them, and a tap (press, release, press) inside one frame is no longer
+merged into a single press with an immediate jump cut. The physics itself
+stays on whole ticks, so replays and batch_sim are unaffected.
+
+With --vsync the frame waits for the display in present(), right after all
+its work, so input polled at the top of the frame is already most of a
+refresh old when it shows. --late-latch moves that wait to the front: after
+a present it sleeps, polling input every millisecond, until the next
+refresh minus the slowest recent frame's work (and a small margin), then
+runs the frame on the freshest input.
+
+--latency-report prints how long each press took from being polled to
+being presented, plus the gap since the previous poll (the most it can
+have sat in SDL's queue unseen).
+
+Run `python latency.py` to compare early and late latching on a simulated
+60 Hz display.
+"""
+import collections
+import os
+import random
+import threading
+import time
+
+import pygame
+
+import simulation as sim
+
+PRESS, RELEASE = 1, 2
+KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class InputLatch:
+    def __init__(self, late=False, margin_ms=2.0, window=60):
+        self.late = late
+        self.margin = margin_ms / 1000
+        self.pending = collections.deque()  # (polled at, PRESS or RELEASE, poll gap), oldest first
+        self.buffered = []  # events polled while waiting
+        self.polled_at = None
+        # Instrumentation
+        self.unshown = []  # (polled at, poll gap) of presses fed to a tick but not yet presented
+        self.latency = []  # seconds from poll to present, per press
+        self.gaps = []
+        self.waited = 0.0
+        # Pacing for late latching
+        self.last_present = None
+        self.period = None  # smoothed interval between presents
+        self.work = [0.0] * window  # recent poll-to-present times, a ring
+        self.work_index = 0
+        self.frame_start = None
+        self.work_end = None
+
+    def _get(self):
+        now = time.perf_counter()
+        events = pygame.event.get()
+        gap = now - self.polled_at if self.polled_at is not None else 0.0
+        self.polled_at = now
+        for event in events:
+            if event.type in KEY_EVENTS:
+                event.latched_at = now
+                event.gap = gap
+        return events
+
+    def poll(self):
+        """pygame.event.get(), including anything polled while waiting; key events are timestamped."""
+        events = self._get()
+        if self.buffered:
+            events = self.buffered + events
+            self.buffered = []
+        return events
+
+    def wait(self):
+        """With late latching, sleep until just before the next present is due, polling input."""
+        if self.late and self.period is not None:
+            start = time.perf_counter()
+            deadline = self.last_present + self.period - max(self.work) - self.margin
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.buffered += self._get()
+                time.sleep(min(remaining, 0.001))
+            self.waited += time.perf_counter() - start
+        self.frame_start = time.perf_counter()
+
+    def press(self, event):
+        self.pending.append((event.latched_at, PRESS, event.gap))
+
+    def release(self, event):
+        self.pending.append((event.latched_at, RELEASE, event.gap))
+
+    def feed(self, inputs, until=None):
+        """Set `inputs` for one tick from the input polled up to `until` (None: all of it).
+        A second press, or a press after a release, waits for the next tick."""
+        pending = self.pending
+        while pending and (until is None or pending[0][0] <= until):
+            polled_at, kind, gap = pending[0]
+            if kind == PRESS:
+                if inputs.jump_pressed or inputs.jump_released:
+                    break
+                inputs.jump_pressed = True
+                self.unshown.append((polled_at, gap))
+            else:
+                if inputs.jump_released:
+                    break
+                inputs.jump_released = True
+            pending.popleft()
+
+    def presenting(self):
+        """Call right before presenting: the frame's work ends here, whatever present() blocks for."""
+        self.work_end = time.perf_counter()
+
+    def presented(self):
+        """Call right after a frame is presented."""
+        now = time.perf_counter()
+        for polled_at, gap in self.unshown:
+            self.latency.append(now - polled_at)
+            self.gaps.append(gap)
+        self.unshown.clear()
+        if self.last_present is not None:
+            interval = now - self.last_present
+            self.period = interval if self.period is None else self.period + (interval - self.period) * 0.1
+        self.last_present = now
+        if self.frame_start is not None:
+            self.work[self.work_index] = (self.work_end or now) - self.frame_start
+            self.work_index = (self.work_index + 1) % len(self.work)
+
+    def summary(self):
+        if not self.latency:
+            return "input latency: no presses presented"
+        ms = [s * 1000 for s in self.latency]
+        gaps = [s * 1000 for s in self.gaps]
+        return (f"input latency ({'late' if self.late else 'early'} latch): {len(ms)} presses, poll to present "
+                f"p50 {percentile(ms, 0.5):.1f} / p90 {percentile(ms, 0.9):.1f} / p99 {percentile(ms, 0.99):.1f} / "
+                f"max {max(ms):.1f} ms, plus up to p50 {percentile(gaps, 0.5):.1f} / max {max(gaps):.1f} ms queued "
+                f"before the poll; waited {self.waited:.1f} s")
+
+
+def add_arguments(parser):
+    parser.add_argument("--late-latch", action="store_true",
+                        help="with --vsync, sleep before the frame instead of after it to read input later")
+    parser.add_argument("--latency-report", action="store_true", help="print input-to-present latency on exit")
+    return parser
+
+
+def from_args(args):
+    return InputLatch(late=args.late_latch)
+
+
+# --- Benchmark ---
+def benchmark(seconds=4, hz=60, work_ms=4):
+    """True press-to-present latency with presents that block until a simulated vsync."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    period = 1 / hz
+    results = {}
+    for late in (False, True):
+        latch = InputLatch(late)
+        stop = threading.Event()
+
+        def typist():
+            rng = random.Random(1)
+            while not stop.wait(rng.uniform(0.05, 0.15)):
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0,
+                                                     sent=time.perf_counter()))
+
+        thread = threading.Thread(target=typist, daemon=True)
+        thread.start()
+        sent, shown, true_latency = collections.deque(), [], []
+        inputs = sim.Inputs()
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            latch.wait()
+            for event in latch.poll():
+                if event.type == pygame.KEYDOWN:
+                    latch.press(event)
+                    sent.append(event.sent)
+            inputs.jump_pressed = inputs.jump_released = False
+            latch.feed(inputs)
+            if inputs.jump_pressed:
+                shown.append(sent.popleft())
+            busy = time.perf_counter() + work_ms / 1000
+            while time.perf_counter() < busy:
+                pass
+            latch.presenting()
+            now = time.perf_counter()
+            time.sleep(period - now % period)  # present() blocking until vsync
+            latch.presented()
+            now = time.perf_counter()
+            true_latency += [now - t for t in shown]
+            shown.clear()
+        stop.set()
+        thread.join()
+        results[late] = [s * 1000 for s in true_latency]
+        print(latch.summary())
+    pygame.quit()
+    for late, ms in results.items():
+        print(f"{'late' if late else 'early'} latch: key to present p50 {percentile(ms, 0.5):.1f} ms, "
+              f"p90 {percentile(ms, 0.9):.1f} ms, max {max(ms):.1f} ms over {len(ms)} presses")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,20 +1,28 @@
 import pygame
 import random
 import math
-import sys, os
 
-pygame.init()
-
-# --- Helper for PyInstaller ---
-def resource_path(relative_path):
-    if hasattr(sys, "_MEIPASS"):
-        return os.path.join(sys._MEIPASS, relative_path)
-    return os.path.join(os.path.abspath("."), relative_path)
+import simulation as sim
+import assets as asset_pipeline
+import timestep
+import collision
+import replay
+import profiler as profiling
+import quality
+import parallax
+import runlog
+import capture as video
+import rewind
+import latency
+import course as courses
+from entities import FIREWALL, SCORE_BOOST, SLOWDOWN, INVINCIBLE, OBSTACLE_NAMES, kind_table
+import dirty as dirty_rects
+from particles import ParticlePool
+from text_cache import TextCache, ScoreCounter, quantize
+from sprites import SpriteCache, pulse as pulse_level
 
 # --- Screen ---
-WIDTH, HEIGHT = 800, 400
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Rialo Jumper")
+WIDTH, HEIGHT = sim.WIDTH, sim.HEIGHT
 
 # --- Colors ---
 WHITE = (255, 255, 255)
@@ -23,320 +31,384 @@ BLACK = (0, 0, 0)
 YELLOW = (255, 255, 0)
 BLUE = (100, 200, 255)
 PURPLE = (200, 100, 255)
-
-# --- Load assets ---
-player_img = pygame.image.load(resource_path("rialo_logo.png"))
-player_img = pygame.transform.scale(player_img, (50, 50))
-bg_img = pygame.image.load(resource_path("background.png"))
-bg_img = pygame.transform.scale(bg_img, (WIDTH, HEIGHT))
-cloud_img = pygame.image.load(resource_path("clouds.png")).convert_alpha()
-cloud_img = pygame.transform.scale(cloud_img, (400, 100))  # smaller clouds
-
-# --- Sounds ---
-jump_sound = pygame.mixer.Sound(resource_path("jump.wav"))
-double_jump_sound = pygame.mixer.Sound(resource_path("double_jump.wav"))
-collision_sound = pygame.mixer.Sound(resource_path("collision.wav"))
-score_sound = pygame.mixer.Sound(resource_path("score.wav"))
-powerup_sound = pygame.mixer.Sound(resource_path("powerup.wav"))
-pygame.mixer.music.load(resource_path("background_music.mp3"))
-pygame.mixer.music.play(-1)
+POWERUP_COLORS = kind_table({SCORE_BOOST: YELLOW, SLOWDOWN: BLUE, INVINCIBLE: PURPLE})
+POWERUP_LABELS = kind_table({SCORE_BOOST: "Score Boost!", SLOWDOWN: "Slow Motion!", INVINCIBLE: "Invincible!"})
 
 # --- Background ---
-bg_x = 0
-cloud_x = 0
 cloud_y = 50  # clouds higher
-bg_scroll_speed = 2
-cloud_speed = 1
-
-# --- Player ---
-player_rect = player_img.get_rect()
-player_rect.x = 50
-player_rect.y = HEIGHT - 100
-player_velocity = 0
-gravity = 0.5
-jump_strength = -12
-jump_cut = 0.5
-max_jumps = 2
-jumps_left = max_jumps
-
-def get_player_hitbox():
-    return pygame.Rect(player_rect.x + 5, player_rect.y + 35, 40, 15)
-
-# --- Obstacles ---
-obstacles = []
-obstacle_width = 50
-spawn_timer = 0
-spawn_interval = 90
-obstacle_speed = 5
-
-# --- Particles ---
-particles = []
-
-# --- Powerups ---
-powerups = []
-powerup_timer = 0
-active_powerup = None
-powerup_duration = 200
-invincible = False
-
-# --- Score ---
-score = 0
-font = pygame.font.Font(None, 36)
-title_font = pygame.font.Font(None, 72)
-
-# --- Game state ---
-game_active = False
-game_over = False
 
 # --- Clock / animation ---
-clock = pygame.time.Clock()
-bob_counter = 0
-bob_speed = 0.05
 bob_amount = 3
 
-# --- Screen shake ---
-shake_timer = 0
-shake_offset = [0,0]
+# --- Text ---
+text_cache = TextCache()
 
 # --- Helpers ---
 def draw_text(text, font, color, surface, x, y, outline=True):
+    shadow_rect = None
     if outline:
-        shadow = font.render(text, True, BLACK)
-        surface.blit(shadow, (x+2, y+2))
-    surface.blit(font.render(text, True, color), (x, y))
-
-def draw_pulse_text(text, font, color1, color2, surface, x, y, time):
-    pulse = (math.sin(time * 3) + 1) / 2
-    color = (
+        shadow = text_cache.render(font, text, BLACK)
+        shadow_rect = surface.blit(shadow, (x+2, y+2))
+    rect = surface.blit(text_cache.render(font, text, color), (x, y))
+    return rect.union(shadow_rect) if shadow_rect else rect
+
+def pulse_color(color1, color2, time):
+    # Quantized so the prompt cycles through a few cached surfaces.
+    pulse = quantize((math.sin(time * 3) + 1) / 2)
+    return (
         int(color1[0] * (1 - pulse) + color2[0] * pulse),
         int(color1[1] * (1 - pulse) + color2[1] * pulse),
         int(color1[2] * (1 - pulse) + color2[2] * pulse),
     )
-    text_surf = font.render(text, True, color)
+
+def draw_pulse_text(text, font, color1, color2, surface, x, y, time):
+    text_surf = text_cache.render(font, text, pulse_color(color1, color2, time))
     rect = text_surf.get_rect(center=(x, y))
-    surface.blit(text_surf, rect)
-
-def reset_game():
-    global player_rect, player_velocity, obstacles, particles, powerups
-    global score, game_over, spawn_interval, obstacle_speed
-    global active_powerup, powerup_timer, invincible, jumps_left
-    global shake_timer
-    player_rect.y = HEIGHT - 100
-    player_velocity = 0
-    obstacles = []
-    particles = []
-    powerups = []
-    score = 0
-    game_over = False
-    spawn_interval = 90
-    obstacle_speed = 5
-    active_powerup = None
-    powerup_timer = 0
-    invincible = False
-    jumps_left = max_jumps
-    shake_timer = 0
-
-# --- Main loop ---
-running = True
-while running:
-    dt = clock.tick(60) / 1000
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                if not game_active:
-                    game_active = True
-                    reset_game()
-                elif jumps_left > 0:
-                    player_velocity = jump_strength
-                    if jumps_left == 1:
-                        double_jump_sound.play()
-                        for i in range(15):
-                            particles.append([[player_rect.x+25, player_rect.y+45],
-                                              [random.uniform(-2,2), random.uniform(-2,-1)],
-                                              random.randint(4,7),
-                                              YELLOW])
-                    else:
-                        jump_sound.play()
-                    jumps_left -= 1
-        if event.type == pygame.KEYUP:
-            if event.key == pygame.K_SPACE and player_velocity < 0:
-                player_velocity *= jump_cut
-
-    if game_active:
-        # --- Background + clouds ---
-        bg_x -= bg_scroll_speed
-        if bg_x <= -WIDTH:
-            bg_x = 0
-        cloud_x -= cloud_speed
-        if cloud_x <= -400:
-            cloud_x = 0
-        screen.blit(bg_img, (bg_x + shake_offset[0], shake_offset[1]))
-        screen.blit(bg_img, (bg_x + WIDTH + shake_offset[0], shake_offset[1]))
-        screen.blit(cloud_img, (cloud_x + shake_offset[0], cloud_y + shake_offset[1]))
-        screen.blit(cloud_img, (cloud_x + 400 + shake_offset[0], cloud_y + shake_offset[1]))
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 100))  # vignette
-        screen.blit(overlay, (0, 0))
-
-        # --- Player physics ---
-        player_velocity += gravity
-        player_rect.y += player_velocity
-        if player_rect.y > HEIGHT - 100:
-            player_rect.y = HEIGHT - 100
-            player_velocity = 0
-            jumps_left = max_jumps
-
-        # --- Player bob ---
-        bob_offset = math.sin(bob_counter * 2 * math.pi) * bob_amount if player_rect.y >= HEIGHT-100 else -5
-        if player_rect.y >= HEIGHT-100:
-            bob_counter += bob_speed
-        screen.blit(player_img, (player_rect.x, player_rect.y + bob_offset + shake_offset[1]))
-
-        # --- Particle trail ---
-        particles.append([[player_rect.x+25, player_rect.y+45],
-                          [random.uniform(-1,-0.5), random.uniform(-1,1)],
-                          random.randint(4,6),
-                          BLUE])
-        for p in particles[:]:
-            p[0][0] += p[1][0]
-            p[0][1] += p[1][1]
-            p[2] -= 0.1
-            if p[2]<=0:
-                particles.remove(p)
-            else:
-                pygame.draw.circle(screen, p[3], (int(p[0][0]), int(p[0][1])), int(p[2]))
-
-        # --- Obstacles + collisions ---
-        spawn_timer += 1
-        if spawn_timer > spawn_interval:
-            obstacle_type = random.choice(["firewall","spike"])
-            height = random.randint(120,180) if obstacle_type=="firewall" else random.randint(100,160)
-            y_pos = HEIGHT - height
-            obstacles.append({"rect":pygame.Rect(WIDTH, y_pos, obstacle_width, height),"type":obstacle_type})
-            if random.random() < 0.2:  # paired
-                offset = random.randint(50,120)
-                obstacles.append({"rect":pygame.Rect(WIDTH+offset, y_pos, obstacle_width, height),"type":obstacle_type})
-            spawn_timer = 0
-
-        for obstacle in obstacles[:]:
-            obstacle["rect"].x -= obstacle_speed
-            if obstacle["type"]=="firewall":
-                pulse = 128 + int(127*math.sin(pygame.time.get_ticks()/200))
-                glow_rect = obstacle["rect"].inflate(12,12)
-                pygame.draw.rect(screen, (255,pulse,pulse), glow_rect)
-                pygame.draw.rect(screen, RED, obstacle["rect"])
-            else:  # spike
-                obstacle["rect"].y += math.sin(pygame.time.get_ticks()/200)*2
-                points = [(obstacle["rect"].x, obstacle["rect"].y+obstacle["rect"].height),
-                          (obstacle["rect"].x+obstacle_width//2, obstacle["rect"].y),
-                          (obstacle["rect"].x+obstacle_width, obstacle["rect"].y+obstacle["rect"].height)]
-                pulse = 128 + int(127*math.sin(pygame.time.get_ticks()/200))
-                glow_points = [(x, y+3) for x,y in points]
-                pygame.draw.polygon(screen, (pulse,pulse,pulse), glow_points)
-                pygame.draw.polygon(screen, WHITE, points)
-
-            if not invincible and get_player_hitbox().colliderect(obstacle["rect"]):
-                collision_sound.play()
-                shake_timer = 10
-                game_active = False
-                game_over = True
-
-            if obstacle["rect"].x + obstacle_width < 0:
-                obstacles.remove(obstacle)
-                score += 1
-                score_sound.play()
-                if score % 3 == 0 and spawn_interval > 40:
-                    spawn_interval -= 2
-                    obstacle_speed += 0.5
-
-        # --- Powerups ---
-        powerup_timer += 1
-        if powerup_timer > 600:
-            p_type = random.choice(["score_boost","slowdown","invincible"])
-            powerups.append({"rect":pygame.Rect(WIDTH, random.randint(150,250),30,30),"type":p_type})
-            powerup_timer = 0
-
-        for p in powerups[:]:
-            p["rect"].x -= 3
-            col = YELLOW if p["type"]=="score_boost" else BLUE if p["type"]=="slowdown" else PURPLE
-            pulse = 128 + int(127*math.sin(pygame.time.get_ticks()/200))
-            pygame.draw.circle(screen, (pulse, pulse, col[2]), p["rect"].center, 15)
-            if player_rect.colliderect(p["rect"]):
-                powerup_sound.play()
-                active_powerup = p["type"]
-                powerups.remove(p)
-                powerup_timer = 0
-                if active_powerup=="score_boost":
-                    score += 5
-                elif active_powerup=="slowdown":
-                    obstacle_speed = max(3, obstacle_speed-2)
-                elif active_powerup=="invincible":
-                    invincible = True
-
-        if active_powerup:
-            powerup_timer += 1
-            status_text = "Score Boost!" if active_powerup=="score_boost" else "Slow Motion!" if active_powerup=="slowdown" else "Invincible!"
-            draw_text(status_text, font, YELLOW, screen, 10,50)
-            bar_ratio = max(0,(powerup_duration - powerup_timer)/powerup_duration)
-            pygame.draw.rect(screen, WHITE, (30,70,40,6))
-            col = BLUE if active_powerup=="slowdown" else YELLOW if active_powerup=="score_boost" else PURPLE
-            pygame.draw.rect(screen, col, (30,70,int(40*bar_ratio),6))
-            if powerup_timer>=powerup_duration:
-                if active_powerup=="slowdown":
-                    obstacle_speed += 2
-                elif active_powerup=="invincible":
-                    invincible=False
-                active_powerup=None
-                powerup_timer=0
-
-        # --- Score ---
-        draw_text(f"Score: {score}", font, WHITE, screen, 10,10)
-
-        # --- Screen shake ---
-        if shake_timer>0:
-            shake_timer -= 1
-            shake_offset[0] = random.randint(-5,5)
-            shake_offset[1] = random.randint(-5,5)
+    return surface.blit(text_surf, rect)
+
+def make_overlay(alpha):
+    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, alpha))
+    return overlay
+
+def tick_effects(events, state, sounds, particles, shake_offset, fx_rng, level=quality.HIGH):
+    # Cosmetic side of one simulation tick: sounds, particles and screen shake.
+    player_rect = state.player_rect
+    for event in events:
+        if event == "double_jump":
+            particles.burst(level.burst(15), player_rect.x+25, player_rect.y+45, (-2,2), (-2,-1), (4,7), YELLOW)
+        sounds.play(event)
+    if not (state.game_active or "collision" in events):
+        return
+
+    # --- Particle trail ---
+    if level.trail(state.frame):
+        particles.burst(1, player_rect.x+25, player_rect.y+45, (-1,-0.5), (-1,1), (4,6), BLUE)
+    particles.update()
+
+    # --- Screen shake ---
+    if state.shake_timer>0:
+        shake_offset[0] = fx_rng.randint(-5,5)
+        shake_offset[1] = fx_rng.randint(-5,5)
+    else:
+        shake_offset[0] = shake_offset[1] = 0
+
+def draw_background(screen, assets, scroll, offset=(0, 0), profiler=profiling.DISABLED, level=quality.HIGH):
+    # Background and clouds with the vignette baked in; clouds are a detail layer.
+    assets["parallax"].draw(screen, scroll, offset[0], offset[1], detail=level.clouds)
+    profiler.mark("background")
+
+def compose(draw, *args):
+    # Render a screen's static content once into its own surface.
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    draw(surface, *args)
+    return surface
+
+def draw_game(screen, state, assets, particles, shake_offset, interp, dirty, static_bg=None, profiler=profiling.DISABLED,
+              level=quality.HIGH):
+    player_img, font = assets["player"], assets["font"]
+    player_rect = state.player_rect
+
+    # --- Background + clouds ---
+    if static_bg is not None:
+        dirty.erase(static_bg)
+        profiler.mark("background")
+    else:
+        scroll = interp.value("scroll", state.scroll)
+        draw_background(screen, assets, scroll, shake_offset, profiler, level)
+        dirty.add_full()
+
+    # --- Player bob ---
+    bob_offset = math.sin(state.bob_counter * 2 * math.pi) * bob_amount if state.on_ground() else -5
+    player_x, player_y = interp.pos(player_rect)
+    dirty.add(screen.blit(player_img, (player_x, player_y + bob_offset + shake_offset[1])))
+    profiler.mark("player")
+
+    # --- Particle trail ---
+    dirty.add(particles.draw(screen))
+    profiler.mark("particles")
+
+    # --- Obstacles ---
+    sprites = assets["sprites"]
+    pulse = pulse_level(pygame.time.get_ticks()/200)
+    firewall_glow, spike_glow = ((255,pulse,pulse), (pulse,pulse,pulse)) if level.glow else (RED, WHITE)
+    glow_pad, spike_drop = (6, 3) if level.glow else (0, 0)
+    for obstacle in state.obstacles:
+        rect = obstacle.rect
+        x, y = interp.pos(rect)
+        if obstacle.kind==FIREWALL:
+            dirty.add(screen.blit(sprites.firewall(rect.height, firewall_glow, glow_pad), (x-glow_pad, y-glow_pad)))
+        else:  # spike
+            dirty.add(screen.blit(sprites.spike(rect.height, spike_glow, spike_drop), (x, y)))
+    profiler.mark("obstacles")
+
+    # --- Powerups ---
+    for p in state.powerups:
+        col = POWERUP_COLORS[p.kind]
+        x, y = interp.pos(p.rect)
+        dirty.add(screen.blit(sprites.orb(15, (pulse, pulse, col[2])), (x + sim.POWERUP_SIZE//2 - 15, y + sim.POWERUP_SIZE//2 - 15)))
+    profiler.mark("powerups")
+
+    active_powerup = state.active_powerup
+    if active_powerup is not None:
+        dirty.add(draw_text(POWERUP_LABELS[active_powerup], font, YELLOW, screen, 10,50))
+        bar_ratio = max(0,(sim.POWERUP_DURATION - state.powerup_timer)/sim.POWERUP_DURATION)
+        dirty.add(pygame.draw.rect(screen, WHITE, (30,70,40,6)))
+        pygame.draw.rect(screen, POWERUP_COLORS[active_powerup], (30,70,int(40*bar_ratio),6))
+
+    # --- Score ---
+    dirty.add(assets["score_counter"].draw(screen, state.score, 10,10))
+    profiler.mark("text")
+
+# --- Start and game-over screens: a composed static layer plus pulsing text ---
+def draw_game_over_static(surface, state, assets):
+    # Background dimmed
+    surface.blit(assets["bg"], (0, 0))
+    surface.blit(assets["clouds"], (assets["parallax"].layers[-1].x(state.scroll), cloud_y))
+    surface.blit(assets["dim"], (0, 0))
+
+    # Score
+    draw_text(f"Score: {state.score}", assets["font"], WHITE, surface, WIDTH//2 - 50, HEIGHT//2)
+
+def game_over_colors(time):
+    pulse = pulse_level(time * 5)
+    return (pulse, 0, 0), pulse_color((255, 255, 255), (255, 100, 100), time)
+
+def draw_game_over(screen, assets, dirty, time):
+    # Glowing "Game Over!"
+    gameover_surf = text_cache.render(assets["title_font"], "GAME OVER", game_over_colors(time)[0])
+    gameover_rect = gameover_surf.get_rect(center=(WIDTH//2, HEIGHT//2 - 80))
+    dirty.add(screen.blit(gameover_surf, gameover_rect))
+
+    # Restart prompt
+    dirty.add(draw_pulse_text("Press SPACE to Restart", assets["font"], (255, 255, 255), (255, 100, 100), screen, WIDTH//2, HEIGHT//2 + 60, time))
+
+def draw_start_static(surface, state, assets):
+    surface.blit(assets["bg"], (0, 0))
+    surface.blit(assets["clouds"], (assets["parallax"].layers[-1].x(state.scroll), cloud_y))
+    surface.blit(assets["dim"], (0, 0))  # dim background
+
+    # Title
+    title_surf = text_cache.render(assets["title_font"], "Rialo Jumper", (255, 215, 0))
+    title_rect = title_surf.get_rect(center=(WIDTH//2, HEIGHT//2 - 60))
+    surface.blit(title_surf, title_rect)
+
+def start_colors(time):
+    return pulse_color((255, 255, 255), (200, 200, 0), time),
+
+def draw_start(screen, assets, dirty, time):
+    # Pulsing "Press SPACE to Start"
+    dirty.add(draw_pulse_text("Press SPACE to Start", assets["font"], (255, 255, 255), (200, 200, 0), screen, WIDTH//2, HEIGHT//2 + 40, time))
+
+# --- Rewind: a past tick of the run, outlined as the collision check sees it ---
+def draw_rewind(screen, view, back, assets, particles, interp, dirty, profiler):
+    draw_game(screen, view, assets, particles, (0, 0), interp, dirty, profiler=profiler)
+    pygame.draw.rect(screen, YELLOW, view.player_hitbox(), 1)
+    for obstacle in view.obstacles:
+        pygame.draw.rect(screen, RED, obstacle.rect, 1)
+    draw_text(f"REWIND -{back} ({back / sim.FPS:.2f}s)  tick {view.frame}", assets["font"], YELLOW, screen, 220, 10)
+    draw_text("LEFT/RIGHT step, SHIFT x10, ESC back", assets["font"], WHITE, screen, 220, 40)
+    profiler.mark("text")
+
+# Profiler phases, in frame order.
+PHASES = ("wait", "events", "update", "particles", "background", "player",
+          "obstacles", "powerups", "text", "overlay", "present", "capture")
+
+MENUS = {
+    "start": (draw_start_static, start_colors, draw_start),
+    "game_over": (draw_game_over_static, game_over_colors, draw_game_over),
+}
+
+def main(argv=None):
+    args = timestep.parse_args(argv, "Rialo Jumper", extra=[dirty_rects.add_arguments, asset_pipeline.add_arguments,
+                                                              collision.add_arguments, replay.add_arguments,
+                                                              profiling.add_arguments, quality.add_arguments,
+                                                              runlog.add_arguments, video.add_arguments,
+                                                              rewind.add_arguments, latency.add_arguments,
+                                                              courses.add_arguments])
+    pygame.init()
+    screen = timestep.set_mode((WIDTH, HEIGHT), args.vsync)
+    pygame.display.set_caption("Rialo Jumper")
+
+    # --- Load assets ---
+    # Images come from the prescaled bundle when it is up to date; audio
+    # loads in the background while the start screen is already showing.
+    sounds = asset_pipeline.SoundBank({
+        "jump": "jump.wav",
+        "double_jump": "double_jump.wav",
+        "collision": "collision.wav",
+        "score": "score.wav",
+        "powerup": "powerup.wav",
+    }, music="background_music.mp3").load_async()
+    images = asset_pipeline.AssetManager("main.bundle")
+    assets = {
+        "player": images.image("rialo_logo.png", (sim.PLAYER_SIZE, sim.PLAYER_SIZE), alpha=True),
+        "bg": images.image("background.png", (WIDTH, HEIGHT), placeholder=(20, 20, 40)),
+        "clouds": images.image("clouds.png", (sim.CLOUD_WIDTH, 100), alpha=True),  # smaller clouds
+        "font": pygame.font.Font(None, 36),
+        "title_font": pygame.font.Font(None, 72),
+        "dim": make_overlay(180),
+    }
+    assets["parallax"] = parallax.Parallax([
+        parallax.Layer(assets["bg"], sim.BG_SCROLL_SPEED),
+        parallax.Layer(assets["clouds"], sim.CLOUD_SPEED, y=cloud_y, detail=True),
+    ], WIDTH, HEIGHT, vignette=100)
+    assets["score_counter"] = ScoreCounter(assets["font"], WHITE)
+    assets["sprites"] = SpriteCache()
+    static_bg = compose(draw_background, assets, 0) if args.static_background else None
+    startup = asset_pipeline.StartupReport(args.startup_report)
+
+    # Gameplay and cosmetics draw from separate streams, so particles and
+    # shake can change without breaking replays.
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    course = courses.Course(seed) if args.course else None
+    state = sim.GameState(seed, pixel_collisions=args.pixel_collisions, course=course)
+    particles = ParticlePool(seed=[seed, 1])
+    fx_rng = random.Random(f"{seed}:fx")
+    recorder = replay.Recorder(seed, args.pixel_collisions, args.course) if args.record else None
+    runs = runlog.from_args(args)
+    run_start = run_powerups = 0
+    # Ticks of the current run for rewinding after a crash; the view is drawn
+    # from a scratch state so the real one is never touched.
+    history = rewind.from_args(args)
+    rewind_back = None
+    view_state = sim.GameState()
+    still = timestep.Interpolator()
+    no_particles = ParticlePool(1)
+    shake_offset = [0,0]
+    clock = pygame.time.Clock()
+    fixed = timestep.FixedTimestep(sim.FPS, args.max_catch_up)
+    interp = timestep.Interpolator()
+    inputs = sim.Inputs()
+    latch = latency.from_args(args)
+    show_gameplay = False
+    dirty = dirty_rects.DirtyRenderer(screen, args.dirty_rects)
+    current_screen = None
+    profiler = profiling.Profiler(PHASES, args.profile, args.profile_csv)
+    capture = video.from_args(args, screen)
+    governor = quality.from_args(args)
+    profiler.notes["quality"] = governor.level.name
+
+    # --- Main loop ---
+    running = True
+    while running:
+        profiler.begin()
+        clock.tick(timestep.frame_cap(args.fps, current_screen == "game"))
+        latch.wait()
+        profiler.mark("wait")
+        governor.begin()
+        for event in latch.poll():
+            profiler.handle_event(event)
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN and rewind_back is not None:
+                step = 10 if event.mod & pygame.KMOD_SHIFT else 1
+                if event.key == pygame.K_LEFT:
+                    rewind_back = min(rewind_back + step, len(history) - 1)
+                elif event.key == pygame.K_RIGHT:
+                    rewind_back = max(rewind_back - step, 0)
+                elif event.key == pygame.K_ESCAPE:
+                    rewind_back = None
+                continue
+            if (event.type == pygame.KEYDOWN and event.key == pygame.K_LEFT and history and state.game_over
+                    and not show_gameplay):
+                rewind_back = 0  # the tick of the crash
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                latch.press(event)
+            if event.type == pygame.KEYUP and event.key == pygame.K_SPACE:
+                latch.release(event)
+        profiler.mark("events")
+
+        # Each tick gets the input polled before its slice of real time, the
+        # last one everything left; input waits if this frame runs no tick.
+        steps = fixed.advance()
+        for i in range(steps):
+            latch.feed(inputs, fixed.tick_end(i, steps) if i < steps - 1 else None)
+            interp.capture((state.player_rect,), (state.obstacles, state.powerups), scroll=state.scroll)
+            if recorder:
+                recorder.tick(inputs)
+            events = sim.step(state, inputs)
+            inputs.jump_pressed = inputs.jump_released = False
+            profiler.mark("update")
+            if "start" in events:
+                particles.clear()
+                run_start, run_powerups = state.frame, 0
+                if history is not None:
+                    history.clear()
+            if history is not None and (state.game_active or "collision" in events):
+                history.record(state)
+            run_powerups += "powerup" in events
+            if "collision" in events and runs:
+                runs.record("main", seed, state.frame - run_start, state.score, run_powerups,
+                            OBSTACLE_NAMES[state.killed_by])
+            tick_effects(events, state, sounds, particles, shake_offset, fx_rng, governor.level)
+            profiler.mark("particles")
+            # The tick that ends in a collision is still drawn as gameplay.
+            show_gameplay = state.game_active or "collision" in events
+        interp.alpha = fixed.alpha
+
+        screen_name = ("rewind" if rewind_back is not None else "game" if show_gameplay
+                       else "game_over" if state.game_over else "start")
+        if screen_name != current_screen:
+            current_screen = screen_name
+            menu_colors = None
+            dirty.add_full()
+            if screen_name in MENUS:
+                menu_bg = compose(MENUS[screen_name][0], state, assets)
+
+        if rewind_back is not None:
+            history.get(rewind_back).restore(view_state)
+            draw_rewind(screen, view_state, rewind_back, assets, no_particles, still, dirty, profiler)
+            drawn = True
+        elif show_gameplay:
+            draw_game(screen, state, assets, particles, shake_offset, interp, dirty, static_bg, profiler, governor.level)
+            drawn = True
+        else:
+            _, colors_at, draw_menu = MENUS[screen_name]
+            time = pygame.time.get_ticks()/1000
+            colors = colors_at(time)
+            drawn = not (dirty.enabled and colors == menu_colors and not dirty.full and not profiler.visible)
+            if drawn:
+                menu_colors = colors
+                dirty.erase(menu_bg)
+                profiler.mark("background")
+                draw_menu(screen, assets, dirty, time)
+                profiler.mark("text")
+        if governor.end():
+            profiler.notes["quality"] = governor.level.name
+        if drawn:
+            dirty.add(profiler.draw(screen))
+            profiler.mark("overlay")
+            latch.presenting()
+            dirty.present()
+            latch.presented()
+            profiler.mark("present")
+            if capture:
+                capture.grab(screen)
+                profiler.mark("capture")
         else:
-            shake_offset = [0,0]
-
-    elif game_over:
-        # Background dimmed
-        screen.blit(bg_img, (0, 0))
-        screen.blit(cloud_img, (cloud_x, cloud_y))
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        screen.blit(overlay, (0, 0))
-
-        # Glowing "Game Over!"
-        pulse = 128 + int(127 * math.sin(pygame.time.get_ticks()/200))
-        gameover_surf = title_font.render("GAME OVER", True, (pulse, 0, 0))
-        gameover_rect = gameover_surf.get_rect(center=(WIDTH//2, HEIGHT//2 - 80))
-        screen.blit(gameover_surf, gameover_rect)
-
-        # Score
-        draw_text(f"Score: {score}", font, WHITE, screen, WIDTH//2 - 50, HEIGHT//2)
-
-        # Restart prompt
-        draw_pulse_text("Press SPACE to Restart", font, (255, 255, 255), (255, 100, 100), screen, WIDTH//2, HEIGHT//2 + 60, pygame.time.get_ticks()/1000)
-
-    else:  # Start screen
-        screen.blit(bg_img, (0, 0))
-        screen.blit(cloud_img, (cloud_x, cloud_y))
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # dim background
-        screen.blit(overlay, (0, 0))
-
-        # Title
-        title_surf = title_font.render("Rialo Jumper", True, (255, 215, 0))
-        title_rect = title_surf.get_rect(center=(WIDTH//2, HEIGHT//2 - 60))
-        screen.blit(title_surf, title_rect)
-
-        # Pulsing "Press SPACE to Start"
-        draw_pulse_text("Press SPACE to Start", font, (255, 255, 255), (200, 200, 0), screen, WIDTH//2, HEIGHT//2 + 40, pygame.time.get_ticks()/1000)
-
-    pygame.display.flip()
-
-pygame.quit()
+            dirty.skip()  # identical to what is already on screen
+            profiler.mark("present")
+        startup.frame_presented(images, sounds)
+        profiler.end()
+
+    profiler.close()
+    if runs:
+        runs.close()
+    if capture:
+        print(capture.close())
+    if args.dirty_rects:
+        print(dirty.summary())
+    if args.audio_report:
+        print(sounds.summary())
+    if args.latency_report:
+        print(latch.summary())
+    if args.profile:
+        print(text_cache.summary())
+    if recorder:
+        recorder.finish(state).save(args.record)
+        print(f"replay saved to {args.record} (seed {seed}, score {state.score})")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Pre-composited parallax backgrounds shared by main.py and rialo_runner.py.
+
+Each Layer's image is tiled once into a strip in display format that is at
+least as wide as the screen, with the vignette darkening baked in, so the
+full-screen overlay blend is gone. Drawing a layer is then at most two
+area-clipped blits at an integer offset: the tail of the strip and, when
+the offset wraps, the head of it.
+
+Layers scroll at their own speed from one shared distance (simulation
+ticks), so the game keeps a single scroll counter however many layers there
+are. Opaque layers hide everything below them, so draw() starts at the last
+opaque one that covers the whole screen.
+
+Run `python parallax.py` to compare frame cost with the old per-frame blits.
+"""
+import os
+import time
+
+import pygame
+
+
+def bake_vignette(surface, alpha):
+    """Copy of `surface` as it looks under a black overlay of `alpha`. Multiplying
+    RGB keeps per-pixel alpha, so baked transparent layers drawn over a baked
+    background match the overlay blended over all of them (within 1 LSB)."""
+    level = 255 - alpha
+    baked = surface.copy()
+    baked.fill((level, level, level), special_flags=pygame.BLEND_RGB_MULT)
+    return baked
+
+
+class Layer:
+    """`image` repeats every image.get_width() pixels and moves `speed` pixels
+    per unit of distance. Detail layers are skipped by draw(detail=False)."""
+
+    def __init__(self, image, speed, y=0, detail=False):
+        self.image = image
+        self.speed = speed
+        self.y = y
+        self.detail = detail
+        self.period = image.get_width()
+        self.height = image.get_height()
+        self.opaque = not image.get_flags() & pygame.SRCALPHA
+        self.strip = None
+
+    def build(self, width, vignette=0):
+        tiles = -(-width // self.period)
+        image = bake_vignette(self.image, vignette) if vignette else self.image
+        strip = pygame.Surface((self.period * tiles, self.height), 0 if self.opaque else pygame.SRCALPHA)
+        # The strip starts fully transparent, so MAX copies RGBA unchanged
+        # where a plain alpha blit would darken semi-transparent pixels.
+        flags = 0 if self.opaque else pygame.BLEND_RGBA_MAX
+        for i in range(tiles):
+            strip.blit(image, (i * self.period, 0), special_flags=flags)
+        if pygame.display.get_surface() is not None:
+            strip = strip.convert() if self.opaque else strip.convert_alpha()
+        self.strip = strip
+        self.strip_width = strip.get_width()
+
+    def x(self, distance):
+        """Screen x of the tile edge after `distance`, in (-period, 0]."""
+        return -(round(distance * self.speed) % self.period)
+
+    def draw(self, surface, distance, dx=0, dy=0):
+        start = (round(distance * self.speed) - dx) % self.period
+        width = surface.get_width()
+        first = min(self.strip_width - start, width)
+        y = self.y + dy
+        surface.blit(self.strip, (0, y), (start, 0, first, self.height))
+        if first < width:
+            surface.blit(self.strip, (first, y), (0, 0, width - first, self.height))
+
+
+class Parallax:
+    def __init__(self, layers, width, height, vignette=0):
+        """`layers` back to front; `vignette` is the alpha of the black overlay to bake in."""
+        self.layers = list(layers)
+        for layer in self.layers:
+            layer.build(width, vignette)
+        # Everything below the last full-screen opaque layer is hidden.
+        self.first = 0
+        for i, layer in enumerate(self.layers):
+            if layer.opaque and layer.y <= 0 and layer.y + layer.height >= height:
+                self.first = i
+
+    def draw(self, surface, distance, dx=0, dy=0, detail=True):
+        for layer in self.layers[self.first:]:
+            if detail or not layer.detail:
+                layer.draw(surface, distance, dx, dy)
+
+
+# --- Benchmark ---
+def benchmark(frames=600):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((800, 400))
+    bg = pygame.Surface((800, 400)).convert()
+    bg.fill((20, 20, 40))
+    clouds = pygame.Surface((400, 100), pygame.SRCALPHA).convert_alpha()
+    clouds.fill((255, 255, 255, 120))
+    vignette = pygame.Surface((800, 400), pygame.SRCALPHA).convert_alpha()
+    vignette.fill((0, 0, 0, 100))
+
+    start = time.perf_counter()
+    for t in range(frames):
+        bg_x, cloud_x = -(t * 2 % 800) - 0.5, -(t % 400)
+        screen.blit(bg, (bg_x, 0))
+        screen.blit(bg, (bg_x + 800, 0))
+        screen.blit(clouds, (cloud_x, 50))
+        screen.blit(clouds, (cloud_x + 400, 50))
+        screen.blit(vignette, (0, 0))
+    old = (time.perf_counter() - start) / frames * 1000
+
+    parallax = Parallax([Layer(bg, 2), Layer(clouds, 1, y=50)], 800, 400, vignette=100)
+    start = time.perf_counter()
+    for t in range(frames):
+        parallax.draw(screen, t + 0.25)
+    new = (time.perf_counter() - start) / frames * 1000
+    pygame.quit()
+    return old, new
+
+
+if __name__ == "__main__":
+    old, new = benchmark()
+    print(f"blits + vignette blend: {old:.3f} ms/frame")
+    print(f"pre-composited strips:  {new:.3f} ms/frame ({old / new:.1f}x)")
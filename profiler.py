@@ -0,0 +1,128 @@
+"""Opt-in per-phase frame profiler.
+
+The game loop calls begin() at the top of each frame, mark(phase) after each
+section and end() once the frame is presented; each mark() charges the time
+since the previous one to `phase`, so a phase can be marked several times a
+frame (once per simulation tick, say) and the parts add up to the frame.
+
+With --profile an overlay (F3 toggles it) shows smoothed per-phase times and
+a rolling frame-time graph, plus any lines the game puts in `notes` (the
+quality level, say); --profile-csv streams one row of microseconds
+per frame. A disabled Profiler replaces its methods with no-ops, so the
+calls left in the loop cost next to nothing.
+"""
+import csv
+from collections import deque
+from time import perf_counter_ns
+
+import pygame
+
+TOGGLE_KEY = pygame.K_F3
+BUDGET_MS = 1000 / 60
+PANEL_WIDTH = 220
+GRAPH_HEIGHT = 60
+
+
+def _nothing(*args):
+    pass
+
+
+class Profiler:
+    def __init__(self, phases=(), enabled=False, csv_path=None, history=PANEL_WIDTH - 20, refresh=15):
+        self.phases = list(phases)
+        self.enabled = enabled or csv_path is not None
+        self.visible = enabled
+        self.notes = {}
+        if not self.enabled:
+            self.begin = self.mark = self.end = _nothing
+            self.draw = lambda screen: None
+            return
+        self.times = dict.fromkeys(self.phases, 0)
+        self.smoothed = dict.fromkeys(self.phases, 0.0)
+        self.history = deque(maxlen=history)
+        self.refresh = refresh
+        self.frame = 0
+        self.start = self.last = 0
+        self.font = None
+        self.panel = None
+        self.csv_file = None
+        if csv_path:
+            self.csv_file = open(csv_path, "w", newline="")
+            self.csv = csv.writer(self.csv_file)
+            self.csv.writerow(["frame", "total_us"] + [f"{p}_us" for p in self.phases])
+
+    def begin(self):
+        self.start = self.last = perf_counter_ns()
+        for phase in self.times:
+            self.times[phase] = 0
+
+    def mark(self, phase):
+        now = perf_counter_ns()
+        self.times[phase] += now - self.last
+        self.last = now
+
+    def end(self):
+        total = perf_counter_ns() - self.start
+        self.frame += 1
+        self.history.append(total / 1e6)
+        for phase, ns in self.times.items():
+            self.smoothed[phase] += (ns / 1e6 - self.smoothed[phase]) * 0.1
+        if self.csv_file:
+            self.csv.writerow([self.frame, total // 1000] + [ns // 1000 for ns in self.times.values()])
+
+    def handle_event(self, event):
+        if self.enabled and event.type == pygame.KEYDOWN and event.key == TOGGLE_KEY:
+            self.visible = not self.visible
+            return True
+        return False
+
+    # --- Overlay ---
+    def _render_panel(self):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        line = self.font.get_linesize()
+        rows = len(self.phases) + 1 + len(self.notes)
+        panel = pygame.Surface((PANEL_WIDTH, GRAPH_HEIGHT + 20 + line * rows), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        average = sum(self.history) / max(1, len(self.history))
+        rows = [("frame", average, (255, 255, 255))]
+        rows += [(phase, ms, (255, 255, 0) if ms > BUDGET_MS / 4 else (200, 200, 200))
+                 for phase, ms in self.smoothed.items()]
+        rows += [(name, text, (0, 200, 255)) for name, text in self.notes.items()]
+        for i, (name, ms, color) in enumerate(rows):
+            y = GRAPH_HEIGHT + 15 + i * line
+            panel.blit(self.font.render(name, True, color), (10, y))
+            value = self.font.render(ms if isinstance(ms, str) else f"{ms:.2f} ms", True, color)
+            panel.blit(value, (PANEL_WIDTH - 10 - value.get_width(), y))
+        self.panel = panel
+
+    def draw(self, screen):
+        """Draw the overlay in the top-right corner; returns the rect drawn or None."""
+        if not self.visible:
+            return None
+        if self.panel is None or self.frame % self.refresh == 0:
+            self._render_panel()
+        x, y = screen.get_width() - PANEL_WIDTH - 10, 10
+        rect = screen.blit(self.panel, (x, y))
+        # Frame-time graph: the budget line sits halfway up, so the top is two frames.
+        bottom = y + 5 + GRAPH_HEIGHT
+        scale = GRAPH_HEIGHT / (BUDGET_MS * 2)
+        pygame.draw.line(screen, (0, 160, 0), (x + 10, bottom - GRAPH_HEIGHT // 2), (x + PANEL_WIDTH - 10, bottom - GRAPH_HEIGHT // 2))
+        if len(self.history) > 1:
+            points = [(x + 10 + i, bottom - min(GRAPH_HEIGHT, ms * scale)) for i, ms in enumerate(self.history)]
+            pygame.draw.lines(screen, (255, 120, 0), False, points)
+        return rect
+
+    def close(self):
+        if self.enabled and self.csv_file:
+            self.csv_file.close()
+            self.csv_file = None
+
+
+DISABLED = Profiler()
+
+
+def add_arguments(parser):
+    parser.add_argument("--profile", action="store_true", help="time each phase of the frame and show an overlay (F3 toggles)")
+    parser.add_argument("--profile-csv", metavar="PATH", help="stream per-frame phase timings in microseconds to a CSV file")
+    return parser
@@ -0,0 +1,128 @@
+"""Adaptive visual quality for main.py and rialo_runner.py.
+
+The Governor times the CPU work of each frame (from after the frame-rate
+wait to just before presenting, so vsync waits don't count) and steps
+through LEVELS: it drops a level as soon as a window of frames has too many
+close to the budget, and climbs back one level only after several windows
+in a row with plenty of headroom, so it doesn't flicker between two levels.
+Only cosmetics change; gameplay and replays are unaffected.
+
+Run `python quality.py` to watch it follow a synthetic frame-time trace.
+"""
+from time import perf_counter_ns
+
+BUDGET_MS = 1000 / 60
+
+
+class Level:
+    """What one quality level draws. trail_every: emit a trail particle every
+    N ticks (0 = no trail); burst_scale: share of a burst's particles kept;
+    glow: pulsing obstacle glow; clouds: detail background layers."""
+    __slots__ = ("name", "trail_every", "burst_scale", "glow", "clouds")
+
+    def __init__(self, name, trail_every, burst_scale, glow, clouds):
+        self.name = name
+        self.trail_every = trail_every
+        self.burst_scale = burst_scale
+        self.glow = glow
+        self.clouds = clouds
+
+    def burst(self, count):
+        return max(1, int(count * self.burst_scale))
+
+    def trail(self, tick):
+        return self.trail_every and tick % self.trail_every == 0
+
+
+LEVELS = (
+    Level("high", 1, 1.0, True, True),
+    Level("medium", 2, 0.6, True, True),
+    Level("low", 3, 0.4, False, True),
+    Level("minimal", 0, 0.2, False, False),
+)
+NAMES = [level.name for level in LEVELS]
+HIGH = LEVELS[0]
+
+
+class Governor:
+    def __init__(self, budget_ms=BUDGET_MS, enabled=True, level=0, window=30,
+                 slow_at=0.8, fast_at=0.45, fast_windows=4):
+        self.enabled = enabled
+        self.index = level
+        self.level = LEVELS[level]
+        self.budget_ns = budget_ms * 1e6
+        self.window = window
+        self.slow_ns = self.budget_ns * slow_at
+        self.fast_ns = self.budget_ns * fast_at
+        self.fast_windows = fast_windows
+        self.changes = 0
+        self.start = 0
+        self._reset_window()
+        self.fast_streak = 0
+
+    def _reset_window(self):
+        self.frames = 0
+        self.slow = 0
+        self.worst = 0
+
+    def begin(self):
+        self.start = perf_counter_ns()
+
+    def end(self):
+        """Close the frame opened by begin(); returns True when the level changed."""
+        if not self.enabled:
+            return False
+        return self.record(perf_counter_ns() - self.start)
+
+    def record(self, ns):
+        self.frames += 1
+        self.slow += ns > self.slow_ns
+        if ns > self.worst:
+            self.worst = ns
+        if self.frames < self.window:
+            return False
+        # A quarter of the window near the budget: shed load now.
+        if self.slow * 4 >= self.window:
+            self.fast_streak = 0
+            return self._set(self.index + 1)
+        self.fast_streak = self.fast_streak + 1 if self.worst < self.fast_ns else 0
+        if self.fast_streak >= self.fast_windows:
+            self.fast_streak = 0
+            return self._set(self.index - 1)
+        self._reset_window()
+        return False
+
+    def _set(self, index):
+        self._reset_window()
+        index = max(0, min(len(LEVELS) - 1, index))
+        if index == self.index:
+            return False
+        self.index = index
+        self.level = LEVELS[index]
+        self.changes += 1
+        return True
+
+
+def add_arguments(parser):
+    parser.add_argument("--quality", choices=["auto"] + NAMES, default="auto",
+                        help="visual quality; auto lowers it when frames run close to the budget (default: auto)")
+    return parser
+
+
+def from_args(args):
+    budget = 1000 / args.fps if args.fps > 0 else BUDGET_MS
+    if args.quality == "auto":
+        return Governor(budget)
+    return Governor(budget, enabled=False, level=NAMES.index(args.quality))
+
+
+if __name__ == "__main__":
+    # Frame work in ms: light, then a heavy stretch per level, then light again.
+    # Each level is assumed to save 30% of the work of the one above.
+    governor = Governor()
+    trace = [6] * 120 + [22] * 300 + [7] * 600
+    for frame, ms in enumerate(trace):
+        cost = ms * 0.7 ** governor.index
+        if governor.record(cost * 1e6):
+            print(f"frame {frame:4}: work {cost:5.1f} ms -> {governor.level.name}")
+    print(f"{governor.changes} level changes over {len(trace)} frames")
@@ -0,0 +1,164 @@
+"""Input-log replays for Rialo Jumper.
+
+A replay is the session seed plus the simulation ticks on which SPACE went
+down or up. GameState(seed) draws all gameplay randomness from its own
+stream, so feeding the same inputs on the same ticks reproduces the run
+exactly; particles and screen shake use separate cosmetic streams and
+never touch it.
+
+File layout: MAGIC, then unsigned LEB128 varints: seed, tick count, final
+score, rule flags (1 = pixel collisions, 2 = seeded course), number of
+input ticks, and per input tick (ticks since the previous one << 2 |
+released << 1 | pressed).
+
+    python replay.py run.rjr [more.rjr ...]
+
+re-simulates each replay headlessly and checks the recorded score.
+"""
+import argparse
+import sys
+import time
+
+import course as courses
+import simulation as sim
+
+MAGIC = b"RJR1"
+PIXEL_COLLISIONS = 1
+COURSE = 2
+
+
+def write_varint(out, value):
+    if value < 0:
+        raise ValueError(f"varints are unsigned, got {value}")
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("truncated replay")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    def __init__(self, seed, inputs=None, ticks=0, score=0, flags=0):
+        self.seed = seed
+        self.flags = flags
+        self.inputs = inputs if inputs is not None else []  # (tick, pressed, released)
+        self.ticks = ticks
+        self.score = score
+
+    def encode(self):
+        out = bytearray(MAGIC)
+        for value in (self.seed, self.ticks, self.score, self.flags, len(self.inputs)):
+            write_varint(out, value)
+        last = 0
+        for tick, pressed, released in self.inputs:
+            write_varint(out, (tick - last) << 2 | released << 1 | pressed)
+            last = tick
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data):
+        if not data.startswith(MAGIC):
+            raise ValueError("not a replay file")
+        pos = len(MAGIC)
+        seed, pos = read_varint(data, pos)
+        ticks, pos = read_varint(data, pos)
+        score, pos = read_varint(data, pos)
+        flags, pos = read_varint(data, pos)
+        count, pos = read_varint(data, pos)
+        inputs, tick = [], 0
+        for _ in range(count):
+            value, pos = read_varint(data, pos)
+            tick += value >> 2
+            inputs.append((tick, bool(value & 1), bool(value & 2)))
+        return cls(seed, inputs, ticks, score, flags)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.decode(f.read())
+
+
+class Recorder:
+    """Call tick() with the Inputs of every sim.step(), in order."""
+
+    def __init__(self, seed, pixel_collisions=False, course=False):
+        self.replay = Replay(seed, flags=(PIXEL_COLLISIONS if pixel_collisions else 0) | (COURSE if course else 0))
+
+    def tick(self, inputs):
+        replay = self.replay
+        if inputs.jump_pressed or inputs.jump_released:
+            replay.inputs.append((replay.ticks, inputs.jump_pressed, inputs.jump_released))
+        replay.ticks += 1
+
+    def finish(self, state):
+        self.replay.score = state.score
+        return self.replay
+
+
+def play(replay):
+    """Re-simulate `replay` with no display. Returns the final GameState."""
+    course = courses.Course(replay.seed) if replay.flags & COURSE else None
+    state = sim.GameState(replay.seed, pixel_collisions=bool(replay.flags & PIXEL_COLLISIONS), course=course)
+    inputs = iter(replay.inputs)
+    next_input = next(inputs, None)
+    for tick in range(replay.ticks):
+        if next_input is not None and next_input[0] == tick:
+            sim.step(state, sim.Inputs(next_input[1], next_input[2]))
+            next_input = next(inputs, None)
+        else:
+            sim.step(state)
+    return state
+
+
+def verify(replay):
+    """(ok, final score, final frame)"""
+    state = play(replay)
+    return state.score == replay.score, state.score, state.frame
+
+
+def seed(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"seed must be 0 or more, got {value}")
+    return value
+
+
+def add_arguments(parser, record=True):
+    parser.add_argument("--seed", type=seed, default=None, help="gameplay seed (random if omitted)")
+    if record:
+        parser.add_argument("--record", metavar="PATH",
+                            help="write an input-log replay of the session to PATH on exit")
+    return parser
+
+
+if __name__ == "__main__":
+    failed = False
+    for path in sys.argv[1:]:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        ok, score, frame = verify(replay)
+        ms = (time.perf_counter() - start) * 1000
+        print(f"{path}: {'ok' if ok else 'MISMATCH'} score {score} (recorded {replay.score}), "
+              f"frame {frame}, {replay.ticks} ticks verified in {ms:.1f} ms")
+        failed |= not ok
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,280 @@
+"""Rewind history for main.py: compact per-tick snapshots of a GameState.
+
+Ticks are stored in groups of KEYFRAME_EVERY: a keyframe holding the full
+state, then deltas that each encode one tick against that keyframe (not
+against the tick before), so decoding any tick is one keyframe plus one
+delta however far back it is. A fixed ring of groups keeps the last
+`seconds` of play; the oldest group is overwritten whole.
+
+Everything is unsigned LEB128 varints (zigzag for signed values, see
+replay.py) except the three float fields, which a delta only repeats when
+they changed. Obstacles in a delta are "dropped from the front since the
+keyframe", position changes of the ones still there, and full entries for
+the ones spawned since. Powerups are few and stored in full every tick.
+
+The gameplay RNG is not part of a snapshot: restoring one and playing on
+gives different spawns from the original run.
+
+On the game-over screen of main.py, LEFT and RIGHT step through the run
+tick by tick (hold SHIFT for ten), with the player hitbox and obstacle
+rects outlined; ESC goes back to the game-over screen.
+
+Run `python rewind.py` to check round trips and measure memory for 30 s.
+"""
+import struct
+import time
+
+import pygame
+
+import simulation as sim
+from entities import Obstacle, Powerup
+from replay import read_varint, write_varint
+
+KEYFRAME_EVERY = 30
+SECONDS = 30
+FLOATS = struct.Struct("<3d")  # player_velocity, obstacle_speed, bob_counter
+SCALARS = ("frame", "score", "jumps_left", "spawn_timer", "spawn_interval", "powerup_timer", "shake_timer",
+           "scroll", "game_active", "game_over", "invincible")
+
+
+def zigzag(n):
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def unzigzag(n):
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+class Snapshot:
+    """One decoded tick. obstacles: (x, y, height, kind); powerups: (x, y, kind)."""
+    __slots__ = SCALARS + ("player_y", "active_powerup", "killed_by", "player_velocity", "obstacle_speed",
+                           "bob_counter", "obstacles", "powerups")
+
+    @classmethod
+    def of(cls, state):
+        snap = cls()
+        for name in SCALARS:
+            setattr(snap, name, int(getattr(state, name)))
+        snap.player_y = state.player_rect.y
+        snap.active_powerup = state.active_powerup
+        snap.killed_by = state.killed_by
+        snap.player_velocity = float(state.player_velocity)
+        snap.obstacle_speed = float(state.obstacle_speed)
+        snap.bob_counter = float(state.bob_counter)
+        snap.obstacles = [(o.rect.x, o.rect.y, o.rect.height, o.kind) for o in state.obstacles]
+        snap.powerups = [(p.rect.x, p.rect.y, p.kind) for p in state.powerups]
+        return snap
+
+    def ints(self):
+        return [getattr(self, name) for name in SCALARS] + [
+            self.player_y, -1 if self.active_powerup is None else self.active_powerup,
+            -1 if self.killed_by is None else self.killed_by]
+
+    def restore(self, state):
+        """Put this tick back into `state` (a GameState); the RNG is left as it is."""
+        for name in SCALARS:
+            setattr(state, name, getattr(self, name))
+        for name in ("game_active", "game_over", "invincible"):
+            setattr(state, name, bool(getattr(self, name)))
+        state.player_rect.y = self.player_y
+        state.active_powerup = self.active_powerup
+        state.killed_by = self.killed_by
+        state.player_velocity = self.player_velocity
+        state.obstacle_speed = self.obstacle_speed
+        state.bob_counter = self.bob_counter
+        state.obstacles = [Obstacle(pygame.Rect(x, y, sim.OBSTACLE_WIDTH, h), kind) for x, y, h, kind in self.obstacles]
+        state.powerups = [Powerup(pygame.Rect(x, y, sim.POWERUP_SIZE, sim.POWERUP_SIZE), kind)
+                          for x, y, kind in self.powerups]
+        state.events.clear()
+        return state
+
+
+def _write_entries(out, entries):
+    write_varint(out, len(entries))
+    for entry in entries:
+        for value in entry:
+            write_varint(out, zigzag(value))
+
+
+def _read_entries(data, pos, width):
+    count, pos = read_varint(data, pos)
+    entries = []
+    for _ in range(count):
+        entry = []
+        for _ in range(width):
+            value, pos = read_varint(data, pos)
+            entry.append(unzigzag(value))
+        entries.append(tuple(entry))
+    return entries, pos
+
+
+def _set_ints(snap, ints):
+    for name, value in zip(SCALARS, ints):
+        setattr(snap, name, value)
+    snap.player_y = ints[len(SCALARS)]
+    active, killed = ints[len(SCALARS) + 1:]
+    snap.active_powerup = None if active < 0 else active
+    snap.killed_by = None if killed < 0 else killed
+
+
+def encode_keyframe(snap):
+    out = bytearray()
+    for value in snap.ints():
+        write_varint(out, zigzag(value))
+    out += FLOATS.pack(snap.player_velocity, snap.obstacle_speed, snap.bob_counter)
+    _write_entries(out, snap.obstacles)
+    _write_entries(out, snap.powerups)
+    return bytes(out)
+
+
+def decode_keyframe(data):
+    snap = Snapshot()
+    ints, pos = [], 0
+    for _ in range(len(SCALARS) + 3):
+        value, pos = read_varint(data, pos)
+        ints.append(unzigzag(value))
+    _set_ints(snap, ints)
+    snap.player_velocity, snap.obstacle_speed, snap.bob_counter = FLOATS.unpack_from(data, pos)
+    pos += FLOATS.size
+    snap.obstacles, pos = _read_entries(data, pos, 4)
+    snap.powerups, pos = _read_entries(data, pos, 3)
+    return snap
+
+
+def encode_delta(snap, key, dropped, kept):
+    """`snap` against keyframe `key`: the first `dropped` keyframe obstacles are
+    gone and the next `kept` are the first `kept` obstacles of `snap`."""
+    out = bytearray()
+    for value, base in zip(snap.ints(), key.ints()):
+        write_varint(out, zigzag(value - base))
+    floats = (snap.player_velocity, snap.obstacle_speed, snap.bob_counter)
+    base = (key.player_velocity, key.obstacle_speed, key.bob_counter)
+    changed = [f != b for f, b in zip(floats, base)]
+    out.append(changed[0] | changed[1] << 1 | changed[2] << 2)
+    for f, c in zip(floats, changed):
+        if c:
+            out += struct.pack("<d", f)
+    write_varint(out, dropped)
+    write_varint(out, kept)
+    for (x, y, _, _), (bx, by, _, _) in zip(snap.obstacles, key.obstacles[dropped:dropped + kept]):
+        write_varint(out, zigzag(x - bx))
+        write_varint(out, zigzag(y - by))
+    _write_entries(out, snap.obstacles[kept:])
+    _write_entries(out, snap.powerups)
+    return bytes(out)
+
+
+def decode_delta(data, key):
+    snap = Snapshot()
+    ints, pos = [], 0
+    for base in key.ints():
+        value, pos = read_varint(data, pos)
+        ints.append(base + unzigzag(value))
+    _set_ints(snap, ints)
+    floats = [key.player_velocity, key.obstacle_speed, key.bob_counter]
+    changed = data[pos]
+    pos += 1
+    for i in range(3):
+        if changed >> i & 1:
+            floats[i] = struct.unpack_from("<d", data, pos)[0]
+            pos += 8
+    snap.player_velocity, snap.obstacle_speed, snap.bob_counter = floats
+    dropped, pos = read_varint(data, pos)
+    kept, pos = read_varint(data, pos)
+    obstacles = []
+    for bx, by, h, kind in key.obstacles[dropped:dropped + kept]:
+        dx, pos = read_varint(data, pos)
+        dy, pos = read_varint(data, pos)
+        obstacles.append((bx + unzigzag(dx), by + unzigzag(dy), h, kind))
+    added, pos = _read_entries(data, pos, 4)
+    snap.obstacles = obstacles + added
+    snap.powerups, pos = _read_entries(data, pos, 3)
+    return snap
+
+
+class History:
+    def __init__(self, seconds=SECONDS, tick_rate=sim.FPS, keyframe_every=KEYFRAME_EVERY):
+        self.every = keyframe_every
+        self.groups = [None] * -(-seconds * tick_rate // keyframe_every)
+        self.count = 0
+        self.key = None  # decoded keyframe of the current group
+        self.key_ids = {}  # id(obstacle) -> index in the current keyframe
+        self.key_objects = []  # keeps those obstacles alive so their ids stay unique
+
+    def __len__(self):
+        """Ticks that can be decoded (whole groups only)."""
+        first_group = max(0, (self.count - 1) // self.every - len(self.groups) + 1)
+        return self.count - first_group * self.every
+
+    def clear(self):
+        self.groups = [None] * len(self.groups)
+        self.count = 0
+
+    def record(self, state):
+        snap = Snapshot.of(state)
+        group = self.count // self.every % len(self.groups)
+        if self.count % self.every == 0:
+            self.key = snap
+            self.key_objects = list(state.obstacles)
+            self.key_ids = {id(o): i for i, o in enumerate(self.key_objects)}
+            self.groups[group] = [encode_keyframe(snap)]
+        else:
+            obstacles = state.obstacles
+            dropped = self.key_ids.get(id(obstacles[0]), len(self.key_objects)) if obstacles else len(self.key_objects)
+            kept = 0
+            while (kept < len(obstacles) and dropped + kept < len(self.key_objects)
+                   and self.key_objects[dropped + kept] is obstacles[kept]):
+                kept += 1
+            self.groups[group].append(encode_delta(snap, self.key, dropped, kept))
+        self.count += 1
+
+    def get(self, back=0):
+        """Snapshot from `back` ticks before the latest one (0 = latest)."""
+        if not 0 <= back < len(self):
+            raise IndexError(f"only {len(self)} ticks of history")
+        tick = self.count - 1 - back
+        group = self.groups[tick // self.every % len(self.groups)]
+        key = decode_keyframe(group[0])
+        offset = tick % self.every
+        return key if offset == 0 else decode_delta(group[offset], key)
+
+    def nbytes(self):
+        return sum(len(data) for group in self.groups if group for data in group)
+
+
+def add_arguments(parser):
+    parser.add_argument("--rewind", type=int, default=SECONDS, metavar="SECONDS",
+                        help=f"seconds of play kept for rewinding after a crash, 0 to disable (default {SECONDS})")
+    return parser
+
+
+def from_args(args):
+    return History(args.rewind) if args.rewind > 0 else None
+
+
+# --- Self-check and benchmark ---
+def _fields(snap):
+    return [getattr(snap, name) for name in Snapshot.__slots__]
+
+
+if __name__ == "__main__":
+    state = sim.GameState(seed=7)
+    sim.press_jump(state)
+    history = History()
+    expected = []
+    for _ in range(SECONDS * sim.FPS):
+        if state.game_over:
+            sim.press_jump(state)  # restart, so resets are covered too
+        sim.step(state, sim.autopilot(state))
+        history.record(state)
+        expected.append(_fields(Snapshot.of(state)))
+    bad = [back for back in range(len(history)) if _fields(history.get(back)) != expected[-1 - back]]
+    start = time.perf_counter()
+    for back in range(len(history)):
+        history.get(back)
+    decode_us = (time.perf_counter() - start) / len(history) * 1e6
+    print(f"{len(history)} ticks in {history.nbytes():,} bytes ({history.nbytes() / len(history):.1f} B/tick), "
+          f"{decode_us:.0f} us per decode, {len(bad)} mismatches")
+
+    restored = history.get(200).restore(sim.GameState())
+    print("restored 200 ticks back:", _fields(Snapshot.of(restored)) == expected[-201])
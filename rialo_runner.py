@@ -2,11 +2,36 @@ import pygame
 import random
 import math
 
+import timestep
+import collision
+import replay
+import profiler as profiling
+import quality
+import parallax
+import runlog
+import capture as video
+from entities import (FIREWALL, SPIKE, SHIELD, DOUBLE_SCORE, HORIZONTAL, VERTICAL, OBSTACLE_NAMES,
+                      Obstacle, Powerup, kind_table)
+import dirty as dirty_rects
+import assets as asset_pipeline
+from particles import ParticlePool
+from text_cache import TextCache
+from sprites import SpriteCache
+
+args = timestep.parse_args(description="Rialo Runner",
+                           extra=[lambda parser: dirty_rects.add_arguments(parser, static_background=False),
+                                  asset_pipeline.add_arguments, collision.add_arguments,
+                                  lambda parser: replay.add_arguments(parser, record=False), profiling.add_arguments,
+                                  quality.add_arguments, runlog.add_arguments, video.add_arguments])
+
+# Gameplay draws from its own seeded stream; particles use a separate one.
+seed = args.seed if args.seed is not None else random.randrange(2**32)
+rng = random.Random(seed)
+
 pygame.init()
-pygame.mixer.init()  # enable sound
 
 WIDTH, HEIGHT = 800, 400
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+screen = timestep.set_mode((WIDTH, HEIGHT), args.vsync)
 pygame.display.set_caption("Rialo Runner")
 
 # Colors
@@ -17,28 +42,27 @@ RED_GLOW = (255, 150, 150)
 SPIKE_GLOW = (200, 200, 200)
 YELLOW = (255, 255, 0)
 BLUE = (0, 200, 255)
-
-# Load player logo
-player_img = pygame.image.load("rialo_logo.png")
-player_img = pygame.transform.scale(player_img, (50, 50))
-
-# Load background
-bg_img = pygame.image.load("background.png")
-bg_img_far = pygame.transform.scale(bg_img, (WIDTH, HEIGHT))
-bg_img_mid = pygame.transform.scale(bg_img, (int(WIDTH*1.1), HEIGHT))
-bg_far_x = 0
-bg_mid_x = 0
-
-# Load sounds
-jump_sound = pygame.mixer.Sound("jump.wav")
-collision_sound = pygame.mixer.Sound("collision.wav")
-score_sound = pygame.mixer.Sound("score.wav")
-powerup_sound = pygame.mixer.Sound("powerup.wav")
-
-# Load background music
-pygame.mixer.music.load("background_music.mp3")  # your music file
-pygame.mixer.music.set_volume(0.5)
-pygame.mixer.music.play(-1)  # loop indefinitely
+POWERUP_COLORS = kind_table({SHIELD: BLUE, DOUBLE_SCORE: YELLOW})
+
+# Load sounds and background music in the background
+sounds = asset_pipeline.SoundBank({
+    "jump": "jump.wav",
+    "collision": "collision.wav",
+    "score": "score.wav",
+    "powerup": "powerup.wav",
+}, music="background_music.mp3", music_volume=0.5).load_async()
+
+# Load player logo and background, prescaled from the asset bundle
+images = asset_pipeline.AssetManager("runner.bundle")
+player_img = images.image("rialo_logo.png", (50, 50), alpha=True)
+bg_img_far = images.image("background.png", (WIDTH, HEIGHT), placeholder=(20, 20, 40))
+bg_img_mid = images.image("background.png", (int(WIDTH*1.1), HEIGHT), placeholder=(20, 20, 40))
+# Vignette baked into the layers; the opaque mid layer hides the far one, so
+# only the mid layer is actually drawn.
+background = parallax.Parallax([parallax.Layer(bg_img_far, 1), parallax.Layer(bg_img_mid, 2)], WIDTH, HEIGHT,
+                               vignette=100)
+scroll = 0
+startup = asset_pipeline.StartupReport(args.startup_report)
 
 # Player setup
 player_rect = player_img.get_rect()
@@ -48,8 +72,12 @@ player_velocity = 0
 gravity = 0.5
 jump_strength = -10
 
+player_hitbox = pygame.Rect(0, 0, 40, 15)
+
 def get_player_hitbox():
-    return pygame.Rect(player_rect.x + 5, player_rect.y + 35, 40, 15)
+    # Updated in place rather than allocated every tick.
+    player_hitbox.topleft = (player_rect.x + 5, player_rect.y + 35)
+    return player_hitbox
 
 # Obstacles
 obstacles = []
@@ -60,34 +88,21 @@ obstacle_speed = 5
 
 # Power-ups
 powerups = []
-POWERUP_TYPES = ["shield", "double_score"]
+POWERUP_TYPES = (SHIELD, DOUBLE_SCORE)
 powerup_timer = 0
 
 # Trail particles
-trail_particles = []
-
-# Particle system
-class Particle:
-    def __init__(self, x, y, color, lifetime):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.lifetime = lifetime
-        self.radius = random.randint(2, 4)
-        self.vx = random.uniform(-0.5, 0.5)
-        self.vy = random.uniform(-1, -0.5)
-
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.lifetime -= 1
-        self.radius *= 0.96
-
-    def draw(self, surface):
-        if self.lifetime > 0:
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), int(self.radius))
-
-particles = []
+trail_particles = ParticlePool(seed=[seed, 1])
+ticks = 0
+
+# Run log: finished runs are written off the game thread
+runs = runlog.from_args(args)
+run_start = 0
+powerups_collected = 0
+
+# Baked obstacle sprites
+sprites = SpriteCache()
+masks = collision.MaskCache() if args.pixel_collisions else None
 
 # Score
 score = 0
@@ -109,12 +124,11 @@ bob_amount = 3
 
 def reset_game():
     global player_rect, player_velocity, obstacles, score, game_over
-    global spawn_interval, obstacle_speed, particles, powerups
-    global shield_active, double_score_active, shield_timer, double_score_timer
+    global spawn_interval, obstacle_speed, powerups
+    global shield_active, double_score_active, shield_timer, double_score_timer, run_start, powerups_collected
     player_rect.y = HEIGHT - 100
     player_velocity = 0
     obstacles = []
-    particles = []
     trail_particles.clear()
     powerups = []
     score = 0
@@ -125,16 +139,195 @@ def reset_game():
     double_score_active = False
     shield_timer = 0
     double_score_timer = 0
+    run_start = ticks
+    powerups_collected = 0
 
 # Helper
+text_cache = TextCache()
+
 def draw_text(text, font, color, surface, x, y):
-    surface.blit(font.render(text, True, color), (x, y))
+    surface.blit(text_cache.render(font, text, color), (x, y))
+
+# One fixed simulation tick
+def update_game():
+    global scroll, player_velocity, bob_counter, bob_offset, ticks
+    global spawn_timer, powerup_timer, spawn_interval, obstacle_speed, score
+    global game_active, game_over, shield_active, shield_timer, double_score_active, double_score_timer
+    global powerups_collected
+
+    ticks += 1
+
+    # Scroll backgrounds
+    scroll += 1
+
+    # Player physics
+    player_velocity += gravity
+    player_rect.y += player_velocity
+    if player_rect.y > HEIGHT - 100:
+        player_rect.y = HEIGHT - 100
+        player_velocity = 0
+
+    # Running bob
+    if player_rect.y >= HEIGHT - 100:
+        bob_counter += bob_speed
+        bob_offset = math.sin(bob_counter * 2 * math.pi) * bob_amount
+    else:
+        bob_offset = -5
+
+    # Spawn obstacles
+    spawn_timer += 1
+    if spawn_timer > spawn_interval:
+        obstacle_type = rng.choice((FIREWALL, SPIKE))
+        if obstacle_type == FIREWALL:
+            height = rng.randint(60, 100)
+            move, amplitude = HORIZONTAL, rng.randint(2, 6)
+        else:
+            height = rng.randint(60, 120)
+            move, amplitude = VERTICAL, rng.randint(10, 20)
+        y_pos = HEIGHT - height
+        obstacles.append(Obstacle(pygame.Rect(WIDTH, y_pos, obstacle_width, height), obstacle_type,
+                                  move, amplitude, rng.uniform(0.03, 0.07)))
+        spawn_timer = 0
+
+    # Spawn power-ups
+    powerup_timer += 1
+    if powerup_timer > 500:
+        p_type = rng.choice(POWERUP_TYPES)
+        y_pos = HEIGHT - 120
+        powerups.append(Powerup(pygame.Rect(WIDTH, y_pos, 30, 30), p_type))
+        powerup_timer = 0
+
+    # Move obstacles; expired ones are compacted out in place
+    kept = 0
+    for obstacle in obstacles:
+        rect = obstacle.rect
+        rect.x -= obstacle_speed
+
+        # Sway from the shared sine table
+        if obstacle.move == VERTICAL:
+            rect.y = (HEIGHT - rect.height) + obstacle.sway()
+        elif obstacle.move == HORIZONTAL:
+            rect.x += obstacle.sway()
+
+        # Score update
+        if rect.x + obstacle_width >= 0:
+            obstacles[kept] = obstacle
+            kept += 1
+        else:
+            score += 2 if double_score_active else 1
+            sounds.play("score")
+            if score % 5 == 0 and spawn_interval > 40:
+                spawn_interval -= 2
+                obstacle_speed += 0.5
+    del obstacles[kept:]
+
+    # Collision: spawns are 200+ px apart and the sway is at most 12 px, so
+    # the list stays x-sorted for the broad phase.
+    if not shield_active:
+        hitbox = get_player_hitbox()
+        for obstacle in collision.candidates(obstacles, hitbox):
+            if collision.hits(hitbox, obstacle, masks):
+                sounds.play("collision")
+                if game_active and runs:
+                    runs.record("runner", seed, ticks - run_start, score, powerups_collected,
+                                OBSTACLE_NAMES[obstacle.kind])
+                game_active = False
+                game_over = True
+
+    # Move power-ups
+    kept = 0
+    for powerup in powerups:
+        powerup.rect.x -= obstacle_speed
+        if player_rect.colliderect(powerup.rect):
+            sounds.play("powerup")
+            powerups_collected += 1
+            if powerup.kind == SHIELD:
+                shield_active = True
+                shield_timer = 300
+            else:
+                double_score_active = True
+                double_score_timer = 300
+        elif powerup.rect.right >= 0:
+            # Off-screen power-ups can never be collected again, so they are dropped too.
+            powerups[kept] = powerup
+            kept += 1
+    del powerups[kept:]
+
+    # Update power-up timers
+    if shield_active:
+        shield_timer -= 1
+        if shield_timer <= 0: shield_active = False
+    if double_score_active:
+        double_score_timer -= 1
+        if double_score_timer <= 0: double_score_active = False
+
+    profiler.mark("update")
+
+    # Player trail
+    if governor.level.trail(ticks):
+        trail_particles.burst(1, player_rect.x + 25, player_rect.y + 50 + bob_offset, (-0.5, 0.5), (-1, -0.5), (2, 4),
+                              WHITE, shrink=0, decay=0.96, life=20)
+    trail_particles.update()
+    profiler.mark("particles")
+
+# Draw the playing field, blended between the last two ticks
+def draw_game():
+    level = governor.level
+    background.draw(screen, interp.value("scroll", scroll))
+    profiler.mark("background")
+
+    # Obstacles
+    pad, drop = (4, 3) if level.glow else (0, 0)
+    for obstacle in obstacles:
+        rect = obstacle.rect
+        x, y = interp.pos(rect)
+        if obstacle.kind == FIREWALL:
+            screen.blit(sprites.firewall(rect.height, RED_GLOW, pad), (x - pad, y - pad))
+        else:
+            screen.blit(sprites.spike(rect.height, SPIKE_GLOW, drop), (x, y))
+    profiler.mark("obstacles")
+
+    # Power-ups
+    for powerup in powerups:
+        x, y = interp.pos(powerup.rect)
+        pygame.draw.rect(screen, POWERUP_COLORS[powerup.kind], (x, y, 30, 30))
+    profiler.mark("powerups")
+
+    # Player trail
+    trail_particles.draw(screen)
+    profiler.mark("particles")
+
+    # Draw player
+    player_x, player_y = interp.pos(player_rect)
+    screen.blit(player_img, (player_x, player_y + bob_offset))
+    profiler.mark("player")
+
+    # Draw score and power-up indicators
+    draw_text(f"Score: {score}", font, WHITE, screen, 10, 10)
+    if shield_active: draw_text("Shield", font, BLUE, screen, 10, 40)
+    if double_score_active: draw_text("2x Score", font, YELLOW, screen, 10, 70)
+    profiler.mark("text")
 
 # Main game loop
+fixed = timestep.FixedTimestep(60, args.max_catch_up)
+interp = timestep.Interpolator()
+bob_offset = 0
+dirty = dirty_rects.DirtyRenderer(screen, args.dirty_rects)
+current_screen = None
+profiler = profiling.Profiler(("wait", "events", "update", "particles", "background", "obstacles",
+                               "powerups", "player", "text", "overlay", "present", "capture"), args.profile,
+                              args.profile_csv)
+capture = video.from_args(args, screen)
+governor = quality.from_args(args)
+profiler.notes["quality"] = governor.level.name
 running = True
 while running:
-    dt = clock.tick(60) / 1000
+    profiler.begin()
+    clock.tick(timestep.frame_cap(args.fps, current_screen == "game"))
+    profiler.mark("wait")
+    governor.begin()
     for event in pygame.event.get():
+        profiler.handle_event(event)
         if event.type == pygame.QUIT:
             running = False
         if event.type == pygame.KEYDOWN:
@@ -144,148 +337,29 @@ while running:
                     reset_game()
                 elif player_rect.y >= HEIGHT - 100:
                     player_velocity = jump_strength
-                    jump_sound.play()
-
-    if game_active:
-        # Scroll backgrounds
-        bg_far_x -= 1
-        bg_mid_x -= 2
-        if bg_far_x <= -WIDTH: bg_far_x = 0
-        if bg_mid_x <= -WIDTH*1.1: bg_mid_x = 0
-
-        screen.blit(bg_img_far, (bg_far_x, 0))
-        screen.blit(bg_img_far, (bg_far_x + WIDTH, 0))
-        screen.blit(bg_img_mid, (bg_mid_x, 0))
-        screen.blit(bg_img_mid, (bg_mid_x + WIDTH*1.1, 0))
-
-        # Vignette overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 100))
-        screen.blit(overlay, (0, 0))
-
-        # Player physics
-        player_velocity += gravity
-        player_rect.y += player_velocity
-        if player_rect.y > HEIGHT - 100:
-            player_rect.y = HEIGHT - 100
-            player_velocity = 0
-
-        # Running bob
-        if player_rect.y >= HEIGHT - 100:
-            bob_counter += bob_speed
-            bob_offset = math.sin(bob_counter * 2 * math.pi) * bob_amount
-        else:
-            bob_offset = -5
-
-        # Spawn obstacles
-        spawn_timer += 1
-        if spawn_timer > spawn_interval:
-            obstacle_type = random.choice(["firewall", "spike"])
-            if obstacle_type == "firewall":
-                height = random.randint(60, 100)
-                y_pos = HEIGHT - height
-                move_pattern = {"type": "horizontal", "amplitude": random.randint(2, 6), "speed": random.uniform(0.03, 0.07)}
-            else:
-                height = random.randint(60, 120)
-                y_pos = HEIGHT - height
-                move_pattern = {"type": "vertical", "amplitude": random.randint(10, 20), "speed": random.uniform(0.03, 0.07)}
-            obstacles.append({
-                "rect": pygame.Rect(WIDTH, y_pos, obstacle_width, height),
-                "type": obstacle_type,
-                "move": move_pattern,
-                "move_counter": 0
-            })
-            spawn_timer = 0
-
-        # Spawn power-ups
-        powerup_timer += 1
-        if powerup_timer > 500:
-            p_type = random.choice(POWERUP_TYPES)
-            y_pos = HEIGHT - 120
-            powerups.append({"rect": pygame.Rect(WIDTH, y_pos, 30, 30), "type": p_type})
-            powerup_timer = 0
-
-        # Move and draw obstacles
-        for obstacle in obstacles[:]:
-            obstacle["rect"].x -= obstacle_speed
-
-            move = obstacle.get("move")
-            if move:
-                obstacle["move_counter"] += move["speed"]
-                if move["type"] == "vertical":
-                    offset = math.sin(obstacle["move_counter"] * 2 * math.pi) * move["amplitude"]
-                    obstacle["rect"].y = (HEIGHT - obstacle["rect"].height) + offset
-                elif move["type"] == "horizontal":
-                    offset = math.sin(obstacle["move_counter"] * 2 * math.pi) * move["amplitude"]
-                    obstacle["rect"].x += offset
-
-            if obstacle["type"] == "firewall":
-                glow_rect = obstacle["rect"].inflate(8, 8)
-                pygame.draw.rect(screen, RED_GLOW, glow_rect)
-                pygame.draw.rect(screen, RED, obstacle["rect"])
-            else:
-                points = [
-                    (obstacle["rect"].x, obstacle["rect"].y + obstacle["rect"].height),
-                    (obstacle["rect"].x + obstacle_width//2, obstacle["rect"].y),
-                    (obstacle["rect"].x + obstacle_width, obstacle["rect"].y + obstacle["rect"].height)
-                ]
-                glow_points = [(x, y + 3) for x, y in points]
-                pygame.draw.polygon(screen, SPIKE_GLOW, glow_points)
-                pygame.draw.polygon(screen, WHITE, points)
-
-            # Collision
-            if get_player_hitbox().colliderect(obstacle["rect"]) and not shield_active:
-                collision_sound.play()
-                game_active = False
-                game_over = True
-
-            # Score update
-            if obstacle["rect"].x + obstacle_width < 0:
-                obstacles.remove(obstacle)
-                score += 2 if double_score_active else 1
-                score_sound.play()
-                if score % 5 == 0 and spawn_interval > 40:
-                    spawn_interval -= 2
-                    obstacle_speed += 0.5
-
-        # Move and draw power-ups
-        for powerup in powerups[:]:
-            powerup["rect"].x -= obstacle_speed
-            color = BLUE if powerup["type"]=="shield" else YELLOW
-            pygame.draw.rect(screen, color, powerup["rect"])
-            if player_rect.colliderect(powerup["rect"]):
-                powerup_sound.play()
-                if powerup["type"] == "shield":
-                    shield_active = True
-                    shield_timer = 300
-                else:
-                    double_score_active = True
-                    double_score_timer = 300
-                powerups.remove(powerup)
-
-        # Update power-up timers
-        if shield_active:
-            shield_timer -= 1
-            if shield_timer <= 0: shield_active = False
-        if double_score_active:
-            double_score_timer -= 1
-            if double_score_timer <= 0: double_score_active = False
-
-        # Player trail
-        trail_particles.append(Particle(player_rect.x + 25, player_rect.y + 50 + bob_offset, WHITE, 20))
-        for particle in trail_particles[:]:
-            particle.update()
-            particle.draw(screen)
-            if particle.lifetime <= 0: trail_particles.remove(particle)
-
-        # Draw player
-        screen.blit(player_img, (player_rect.x, player_rect.y + bob_offset))
-
-        # Draw score and power-up indicators
-        draw_text(f"Score: {score}", font, WHITE, screen, 10, 10)
-        if shield_active: draw_text("Shield", font, BLUE, screen, 10, 40)
-        if double_score_active: draw_text("2x Score", font, YELLOW, screen, 10, 70)
-
+                    sounds.play("jump")
+    profiler.mark("events")
+
+    # The tick that ends in a collision is still drawn as gameplay.
+    show_gameplay = game_active
+    for _ in range(fixed.advance()):
+        if not game_active:
+            break
+        interp.capture((player_rect,), (obstacles, powerups), scroll=scroll)
+        update_game()
+    interp.alpha = fixed.alpha
+
+    # Gameplay scrolls the whole screen; the menus are static once drawn.
+    screen_name = "game" if show_gameplay else "game_over" if game_over else "start"
+    if screen_name == current_screen and screen_name != "game" and dirty.enabled and not profiler.visible:
+        dirty.skip()
+        profiler.end()
+        continue
+    current_screen = screen_name
+    dirty.add_full()
+
+    if show_gameplay:
+        draw_game()
     elif game_over:
         screen.fill(WHITE)
         draw_text("Game Over!", font, RED, screen, WIDTH//2 - 80, HEIGHT//2 - 30)
@@ -295,7 +369,29 @@ while running:
         screen.fill(WHITE)
         draw_text("Rialo Runner", font, BLACK, screen, WIDTH//2 - 80, HEIGHT//2 - 30)
         draw_text("Press SPACE to Start", font, BLACK, screen, WIDTH//2 - 100, HEIGHT//2 + 10)
-
-    pygame.display.flip()
-
+        profiler.mark("text")
+    if governor.end():
+        profiler.notes["quality"] = governor.level.name
+
+    profiler.draw(screen)
+    profiler.mark("overlay")
+    dirty.present()
+    profiler.mark("present")
+    if capture:
+        capture.grab(screen)
+        profiler.mark("capture")
+    startup.frame_presented(images, sounds)
+    profiler.end()
+
+profiler.close()
+if runs:
+    runs.close()
+if capture:
+    print(capture.close())
+if args.dirty_rects:
+    print(dirty.summary())
+if args.audio_report:
+    print(sounds.summary())
+if args.profile:
+    print(text_cache.summary())
 pygame.quit()
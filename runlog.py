@@ -0,0 +1,214 @@
+"""Append-only log of finished runs, written off the game thread.
+
+record() only puts a tuple on a bounded queue; it never waits. When the
+queue is full the run is counted in `dropped` instead of stalling the
+frame. A daemon writer thread owns the SQLite connection (WAL mode, so
+leaderboard reads don't wait for it) and commits rows in batches: after
+the first row it keeps collecting for up to `flush_interval` seconds or
+`batch` rows, then writes them in one transaction. A failing database
+only costs the log, never the game.
+
+    python runlog.py                     # leaderboard and death causes
+    python runlog.py --game runner --top 20
+    python runlog.py --bench             # record() vs a synchronous commit
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get("RIALO_RUN_LOG") or os.path.join(os.path.expanduser("~"), ".local", "share",
+                                                                   "rialo-jumper", "runs.db")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    seed INTEGER,
+    ended REAL NOT NULL,
+    ticks INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    powerups INTEGER NOT NULL,
+    cause TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (game, score DESC);
+"""
+INSERT = "INSERT INTO runs (game, seed, ended, ticks, score, powerups, cause) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_STOP = object()
+
+
+def connect(path):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class RunLog:
+    def __init__(self, path=DEFAULT_PATH, capacity=256, batch=64, flush_interval=1.0):
+        self.path = path
+        self.queue = queue.Queue(capacity)
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.commits = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="runlog", daemon=True)
+        self.thread.start()
+
+    def record(self, game, seed, ticks, score, powerups=0, cause=None):
+        """Queue one finished run. Never blocks."""
+        try:
+            self.queue.put_nowait((game, seed, time.time(), ticks, score, powerups, cause))
+        except queue.Full:
+            self.dropped += 1
+
+    # --- Writer thread ---
+    def _collect(self, first):
+        rows = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(rows) < self.batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                row = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if row is _STOP:
+                return rows, True
+            rows.append(row)
+        return rows, False
+
+    def _run(self):
+        try:
+            conn = connect(self.path)
+        except (OSError, sqlite3.Error) as e:
+            conn, self.error = None, e
+        stopping = False
+        while not stopping:
+            row = self.queue.get()
+            if row is _STOP:
+                break
+            rows, stopping = self._collect(row)
+            if conn is None:
+                self.dropped += len(rows)
+                continue
+            try:
+                with conn:
+                    conn.executemany(INSERT, rows)
+                self.written += len(rows)
+                self.commits += 1
+            except sqlite3.Error as e:
+                self.error = e
+                self.dropped += len(rows)
+        if conn is not None:
+            conn.close()
+
+    def close(self, timeout=2.0):
+        """Flush what is queued and stop the writer; waits at most `timeout` seconds."""
+        if not self.thread.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+        if self.error is not None:
+            print(f"warning: run log {self.path}: {self.error}", file=sys.stderr)
+
+
+# --- Queries ---
+def leaderboard(path=DEFAULT_PATH, game=None, limit=10):
+    """Best runs as (score, game, ticks, powerups, cause, ended) rows, best first."""
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        where, params = ("WHERE game = ?", (game,)) if game else ("", ())
+        return conn.execute(f"SELECT score, game, ticks, powerups, cause, ended FROM runs {where} "
+                            "ORDER BY score DESC, ticks ASC LIMIT ?", params + (limit,)).fetchall()
+    finally:
+        conn.close()
+
+
+def causes(path=DEFAULT_PATH, game=None):
+    """(cause, runs, mean score) per death cause, most common first."""
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        where, params = ("WHERE game = ?", (game,)) if game else ("", ())
+        return conn.execute(f"SELECT cause, COUNT(*), AVG(score) FROM runs {where} "
+                            "GROUP BY cause ORDER BY COUNT(*) DESC", params).fetchall()
+    finally:
+        conn.close()
+
+
+def add_arguments(parser):
+    parser.add_argument("--run-log", metavar="PATH", default=DEFAULT_PATH,
+                        help=f"SQLite file that finished runs are appended to (default: {DEFAULT_PATH})")
+    parser.add_argument("--no-run-log", dest="run_log", action="store_const", const=None,
+                        help="don't record runs")
+    return parser
+
+
+def from_args(args):
+    return RunLog(args.run_log) if args.run_log else None
+
+
+# --- Benchmark ---
+def benchmark(runs=200):
+    """Worst and mean game-thread cost of logging a run, queued vs committed inline (ms)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        conn = connect(os.path.join(tmp, "sync.db"))
+        costs = []
+        for i in range(runs):
+            start = time.perf_counter()
+            with conn:
+                conn.execute(INSERT, ("bench", i, time.time(), 600, i, 0, "spike"))
+            costs.append(time.perf_counter() - start)
+        conn.close()
+        results["synchronous commit"] = costs
+
+        log = RunLog(os.path.join(tmp, "async.db"), flush_interval=0.05)
+        costs = []
+        for i in range(runs):
+            start = time.perf_counter()
+            log.record("bench", i, 600, i, 0, "spike")
+            costs.append(time.perf_counter() - start)
+        log.close()
+        results["queued record()"] = costs
+        print(f"async log: {log.written} rows in {log.commits} commits, {log.dropped} dropped")
+    return {name: (max(c) * 1000, sum(c) / len(c) * 1000) for name, c in results.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="show the run log leaderboard")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("--game", choices=["main", "runner"])
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--bench", action="store_true", help="time record() against a synchronous commit")
+    args = parser.parse_args()
+    if args.bench:
+        for name, (worst, mean) in benchmark().items():
+            print(f"{name:<20} worst {worst:8.3f} ms, mean {mean:8.4f} ms")
+        sys.exit(0)
+    rows = leaderboard(args.db, args.game, args.top)
+    if not rows:
+        print(f"no runs in {args.db}")
+        sys.exit(0)
+    print(f"{'#':>3} {'score':>6} {'game':<7} {'time':>7} {'powerups':>8}  cause")
+    for rank, (score, game, ticks, powerups, cause, ended) in enumerate(rows, 1):
+        print(f"{rank:>3} {score:>6} {game:<7} {ticks / 60:6.1f}s {powerups:>8}  {cause or '-'}")
+    print()
+    for cause, count, mean in causes(args.db, args.game):
+        print(f"{cause or '-':<10} {count:>6} runs, mean score {mean:.1f}")
@@ -0,0 +1,276 @@
+"""Headless multi-session game server on asyncio, plus a load-test client.
+
+Every TCP connection gets its own simulation.GameState. One scheduler task
+ticks all sessions at sim.FPS on a shared clock, applies the SPACE presses
+and releases that arrived since the last tick, and writes each client a
+binary snapshot. Clients whose socket buffer backs up skip snapshots
+instead of slowing the tick for everyone.
+
+Protocol (little-endian; every server message is prefixed with a u16 length):
+  client hello  b"RJS1" + u32 seed (0 = random), then one byte per input:
+                bit 0 = pressed, bit 1 = released
+  stats query   b"RJSQ": one JSON message with tick timings since the last
+                query (at most the last STATS_WINDOW seconds), then the
+                server closes the connection
+  snapshot      SNAPSHOT header, then per obstacle OBSTACLE, then a u8 count
+                and per powerup POWERUP
+
+    python server.py --port 8765
+    python server.py --load-test 16 64 256 --seconds 5
+
+--load-test starts a server process, connects waves of bot clients and
+reports tick work, tick lateness and sessions per core.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import struct
+import subprocess
+import sys
+
+import simulation as sim
+
+HELLO = b"RJS1"
+STATS = b"RJSQ"
+PRESSED, RELEASED = 1, 2
+LENGTH = struct.Struct("<H")
+SEED = struct.Struct("<I")
+# tick, score, player y, player velocity, flags, active powerup, events, obstacle count
+SNAPSHOT = struct.Struct("<IIhfBBBB")
+OBSTACLE = struct.Struct("<hhHB")  # x, y, height, kind
+POWERUP = struct.Struct("<hhB")  # x, y, kind
+ACTIVE, OVER, INVINCIBLE = 1, 2, 4
+NO_POWERUP = 255
+EVENT_BITS = {"start": 1, "jump": 2, "double_jump": 4, "score": 8, "powerup": 16, "collision": 32}
+MAX_BUFFERED = 64 * 1024  # bytes queued for one client before its snapshots are skipped
+STATS_WINDOW = 600  # seconds of tick timings kept between stats queries
+
+
+def encode_snapshot(state, tick, events, out):
+    """Append one length-prefixed snapshot of `state` to the bytearray `out`."""
+    start = len(out)
+    out += b"\0\0"
+    flags = state.game_active * ACTIVE | state.game_over * OVER | state.invincible * INVINCIBLE
+    event_bits = 0
+    for event in events:
+        event_bits |= EVENT_BITS.get(event, 0)
+    active = NO_POWERUP if state.active_powerup is None else state.active_powerup
+    out += SNAPSHOT.pack(tick, state.score, state.player_rect.y, state.player_velocity, flags, active, event_bits,
+                         len(state.obstacles))
+    for obstacle in state.obstacles:
+        rect = obstacle.rect
+        out += OBSTACLE.pack(rect.x, rect.y, rect.height, obstacle.kind)
+    out.append(len(state.powerups))
+    for p in state.powerups:
+        out += POWERUP.pack(p.rect.x, p.rect.y, p.kind)
+    LENGTH.pack_into(out, start, len(out) - start - 2)
+    return out
+
+
+def decode_snapshot(data):
+    """Inverse of encode_snapshot() for one message body (without its length)."""
+    tick, score, y, velocity, flags, active, event_bits, count = SNAPSHOT.unpack_from(data)
+    pos = SNAPSHOT.size
+    obstacles = [OBSTACLE.unpack_from(data, pos + i * OBSTACLE.size) for i in range(count)]
+    pos += count * OBSTACLE.size
+    powerups = [POWERUP.unpack_from(data, pos + 1 + i * POWERUP.size) for i in range(data[pos])]
+    return {"tick": tick, "score": score, "player_y": y, "player_velocity": velocity, "flags": flags,
+            "active_powerup": None if active == NO_POWERUP else active, "events": event_bits,
+            "obstacles": obstacles, "powerups": powerups}
+
+
+# --- Server ---
+class Session:
+    __slots__ = ("state", "writer", "inputs", "skipped")
+
+    def __init__(self, seed, writer):
+        self.state = sim.GameState(seed)
+        self.writer = writer
+        self.inputs = sim.Inputs()
+        self.skipped = 0
+
+
+class Server:
+    def __init__(self, tick_rate=sim.FPS):
+        self.dt = 1 / tick_rate
+        self.sessions = set()
+        self.ticks = 0
+        # Per tick: seconds spent stepping every session, and how late the tick
+        # started. Bounded, so a server nobody queries doesn't grow without limit.
+        self.work = collections.deque(maxlen=STATS_WINDOW * tick_rate)
+        self.late = collections.deque(maxlen=STATS_WINDOW * tick_rate)
+
+    async def handle(self, reader, writer):
+        try:
+            magic = await reader.readexactly(4)
+            if magic == STATS:
+                body = json.dumps(self.stats()).encode()
+                writer.write(LENGTH.pack(len(body)) + body)
+                await writer.drain()
+                return
+            if magic != HELLO:
+                return
+            seed = SEED.unpack(await reader.readexactly(SEED.size))[0] or random.randrange(2**32)
+            session = Session(seed, writer)
+            self.sessions.add(session)
+            try:
+                while True:
+                    data = await reader.read(256)
+                    if not data:
+                        break
+                    for byte in data:
+                        session.inputs.jump_pressed |= bool(byte & PRESSED)
+                        session.inputs.jump_released |= bool(byte & RELEASED)
+            finally:
+                self.sessions.discard(session)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def tick(self):
+        for session in self.sessions:
+            state, inputs = session.state, session.inputs
+            events = sim.step(state, inputs)
+            inputs.jump_pressed = inputs.jump_released = False
+            transport = session.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > MAX_BUFFERED:
+                session.skipped += 1
+                continue
+            # A fresh buffer each time: the transport may keep what it couldn't send yet.
+            session.writer.write(encode_snapshot(state, self.ticks, events, bytearray()))
+        self.ticks += 1
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            now = loop.time()
+            self.late.append(now - next_tick)
+            self.tick()
+            self.work.append(loop.time() - now)
+            next_tick += self.dt
+            if loop.time() - next_tick > 5 * self.dt:
+                next_tick = loop.time()  # hopelessly behind: drop the backlog rather than burst
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+
+    def stats(self):
+        def ms(values, q):
+            return round(sorted(values)[min(len(values) - 1, int(q * len(values)))] * 1000, 3) if values else None
+
+        work, late = self.work, self.late
+        result = {"sessions": len(self.sessions), "ticks": len(work),
+                  "work_mean_ms": round(sum(work) / len(work) * 1000, 3) if work else None,
+                  "work_p99_ms": ms(work, 0.99), "late_p50_ms": ms(late, 0.5), "late_p99_ms": ms(late, 0.99),
+                  "late_max_ms": ms(late, 1.0), "skipped": sum(s.skipped for s in self.sessions)}
+        work.clear()
+        late.clear()
+        return result
+
+
+async def serve(host, port, ready=None):
+    server = Server()
+    listener = await asyncio.start_server(server.handle, host, port)
+    if ready:
+        ready()
+    async with listener:
+        await server.run()
+
+
+# --- Load test ---
+async def bot(host, port, seed, stop, received, press_chance=0.03):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(HELLO + SEED.pack(seed) + bytes([PRESSED]))
+    rng = random.Random(seed)
+
+    async def read():
+        while True:
+            (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+            decode_snapshot(await reader.readexactly(length))
+            received[0] += 1
+
+    reading = asyncio.ensure_future(read())
+    try:
+        while not stop.is_set():
+            await asyncio.sleep(1 / sim.FPS)
+            if rng.random() < press_chance:
+                writer.write(bytes([PRESSED | RELEASED * (rng.random() < 0.5)]))
+    finally:
+        reading.cancel()
+        writer.close()
+
+
+async def query_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(STATS)
+    (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    stats = json.loads(await reader.readexactly(length))
+    writer.close()
+    return stats
+
+
+async def load_test(host, port, waves, seconds):
+    results = []
+    for n in waves:
+        stop = asyncio.Event()
+        received = [0]
+        bots = [asyncio.ensure_future(bot(host, port, seed + 1, stop, received)) for seed in range(n)]
+        await asyncio.sleep(1)  # let everyone connect
+        await query_stats(host, port)  # reset the server's counters
+        received[0] = 0
+        await asyncio.sleep(seconds)
+        stats = await query_stats(host, port)
+        stop.set()
+        await asyncio.gather(*bots, return_exceptions=True)
+        stats["snapshots_per_s"] = round(received[0] / seconds)
+        budget = 1000 / sim.FPS
+        stats["sessions_per_core"] = int(n * budget / stats["work_mean_ms"]) if stats["work_mean_ms"] else None
+        results.append((n, stats))
+        await asyncio.sleep(0.5)
+    return results
+
+
+def run_load_test(args):
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--host", args.host, "--port", str(args.port)],
+                            stdout=subprocess.PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        for line in proc.stdout:  # skip pygame's banner
+            if line.startswith(b"listening"):
+                break
+        else:
+            sys.exit("server failed to start")
+        results = asyncio.run(load_test(args.host, args.port, args.load_test, args.seconds))
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(f"{'sessions':>8} {'work ms':>8} {'p99':>7} {'late p50':>9} {'p99':>7} {'max':>7} "
+          f"{'snap/s':>8} {'skipped':>8} {'sessions/core':>14}")
+    for n, s in results:
+        print(f"{n:>8} {s['work_mean_ms']:8.3f} {s['work_p99_ms']:7.3f} {s['late_p50_ms']:9.3f} {s['late_p99_ms']:7.3f} "
+              f"{s['late_max_ms']:7.3f} {s['snapshots_per_s']:8} {s['skipped']:8} {s['sessions_per_core']:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="headless multi-session Rialo Jumper server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--load-test", type=int, nargs="+", metavar="SESSIONS",
+                        help="start a server and measure it with waves of this many bot clients")
+    parser.add_argument("--seconds", type=float, default=5, help="measured seconds per load-test wave")
+    args = parser.parse_args()
+    if args.load_test:
+        run_load_test(args)
+        return
+    try:
+        asyncio.run(serve(args.host, args.port, lambda: print(f"listening on {args.host}:{args.port}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
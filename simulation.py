@@ -0,0 +1,275 @@
+"""Headless Rialo Jumper simulation: gameplay state and rules with no display or audio.
+
+main.py renders a GameState; anything that wants to run the game without a
+window (CI, servers, bots) drives step() directly.
+"""
+import math
+import random
+
+import pygame
+
+import collision
+from entities import FIREWALL, SPIKE, SCORE_BOOST, SLOWDOWN, INVINCIBLE, Obstacle, Powerup
+
+# --- Screen ---
+WIDTH, HEIGHT = 800, 400
+FPS = 60
+GROUND_Y = HEIGHT - 100
+
+# --- Player ---
+PLAYER_X = 50
+PLAYER_SIZE = 50
+GRAVITY = 0.5
+JUMP_STRENGTH = -12
+JUMP_CUT = 0.5
+MAX_JUMPS = 2
+
+# --- Obstacles ---
+OBSTACLE_TYPES = (FIREWALL, SPIKE)
+OBSTACLE_WIDTH = 50
+OBSTACLE_HEIGHTS = {FIREWALL: (120, 180), SPIKE: (100, 160)}  # inclusive ranges
+SPAWN_INTERVAL = 90
+MIN_SPAWN_INTERVAL = 40
+OBSTACLE_SPEED = 5
+PAIR_CHANCE = 0.2
+# Every SPEEDUP_EVERY points the spawn interval shrinks (down to MIN_SPAWN_INTERVAL)
+# and obstacles speed up.
+SPEEDUP_EVERY = 3
+SPAWN_INTERVAL_STEP = 2
+SPEED_STEP = 0.5
+
+# --- Powerups ---
+POWERUP_TYPES = (SCORE_BOOST, SLOWDOWN, INVINCIBLE)
+POWERUP_SIZE = 30
+POWERUP_SPEED = 3
+POWERUP_INTERVAL = 600
+POWERUP_DURATION = 200
+SLOWDOWN_STEP = 2
+SLOWDOWN_MIN_SPEED = 3
+
+# --- Background ---
+BG_SCROLL_SPEED = 2
+CLOUD_SPEED = 1
+CLOUD_WIDTH = 400
+BOB_SPEED = 0.05
+
+
+def pulse_phase(frame):
+    # Matches the old pygame.time.get_ticks()/200 at 60 FPS, but tied to
+    # simulation frames so runs are reproducible.
+    return frame * 1000 / FPS / 200
+
+
+class Inputs:
+    __slots__ = ("jump_pressed", "jump_released")
+
+    def __init__(self, jump_pressed=False, jump_released=False):
+        self.jump_pressed = jump_pressed
+        self.jump_released = jump_released
+
+
+NO_INPUT = Inputs()
+
+
+class GameState:
+    def __init__(self, seed=None, pixel_collisions=False, course=None):
+        self.rng = random.Random(seed)
+        # A course.Course schedules obstacles and powerups instead of the spawn timers.
+        self.course = course
+        # Spikes collide as triangles instead of rects; batch_sim only does rects.
+        self.masks = collision.MaskCache() if pixel_collisions else None
+        self.game_active = False
+        self.game_over = False
+        self.frame = 0
+        self.spawn_timer = 0
+        self.scroll = 0  # ticks of background scrolling, see parallax.py
+        self.bob_counter = 0
+        self.events = []
+        self.player_rect = pygame.Rect(PLAYER_X, GROUND_Y, PLAYER_SIZE, PLAYER_SIZE)
+        self.hitbox = pygame.Rect(0, 0, 40, 15)
+        self.reset()
+
+    def reset(self):
+        # Mirrors the old reset_game(): spawn_timer and scroll offsets carry over.
+        self.player_rect.y = GROUND_Y
+        self.player_velocity = 0
+        self.jumps_left = MAX_JUMPS
+        self.obstacles = []
+        self.powerups = []
+        self.score = 0
+        self.game_over = False
+        self.spawn_interval = SPAWN_INTERVAL
+        self.obstacle_speed = OBSTACLE_SPEED
+        self.active_powerup = None
+        self.powerup_timer = 0
+        self.invincible = False
+        self.shake_timer = 0
+        self.killed_by = None  # kind of the obstacle that ended the run
+        if self.course is not None:
+            self.course.restart()
+
+    def player_hitbox(self):
+        # Updated in place; the returned Rect changes on the next call.
+        self.hitbox.topleft = (self.player_rect.x + 5, self.player_rect.y + 35)
+        return self.hitbox
+
+    def on_ground(self):
+        return self.player_rect.y >= GROUND_Y
+
+
+def press_jump(state):
+    if not state.game_active:
+        state.game_active = True
+        state.reset()
+        state.events.append("start")
+    elif state.jumps_left > 0:
+        state.player_velocity = JUMP_STRENGTH
+        state.events.append("double_jump" if state.jumps_left == 1 else "jump")
+        state.jumps_left -= 1
+
+
+def release_jump(state):
+    if state.player_velocity < 0:
+        state.player_velocity *= JUMP_CUT
+
+
+def step(state, inputs=NO_INPUT):
+    """Advance one frame. Returns the list of events raised this frame (reused by the next step)."""
+    state.events.clear()
+    if inputs.jump_pressed:
+        press_jump(state)
+    if inputs.jump_released:
+        release_jump(state)
+    if not state.game_active:
+        return state.events
+
+    state.frame += 1
+    rng = state.rng
+
+    # --- Background + clouds ---
+    state.scroll += 1
+
+    # --- Player physics ---
+    player_rect = state.player_rect
+    state.player_velocity += GRAVITY
+    player_rect.y += state.player_velocity
+    if player_rect.y > GROUND_Y:
+        player_rect.y = GROUND_Y
+        state.player_velocity = 0
+        state.jumps_left = MAX_JUMPS
+    if player_rect.y >= GROUND_Y:
+        state.bob_counter += BOB_SPEED
+
+    # --- Obstacles + collisions ---
+    if state.course is not None:
+        state.course.spawn(state)
+    else:
+        state.spawn_timer += 1
+        if state.spawn_timer > state.spawn_interval:
+            obstacle_type = rng.choice(OBSTACLE_TYPES)
+            height = rng.randint(*OBSTACLE_HEIGHTS[obstacle_type])
+            y_pos = HEIGHT - height
+            state.obstacles.append(Obstacle(pygame.Rect(WIDTH, y_pos, OBSTACLE_WIDTH, height), obstacle_type))
+            if rng.random() < PAIR_CHANCE:
+                offset = rng.randint(50, 120)
+                state.obstacles.append(Obstacle(pygame.Rect(WIDTH + offset, y_pos, OBSTACLE_WIDTH, height), obstacle_type))
+            state.spawn_timer = 0
+
+    wobble = math.sin(pulse_phase(state.frame)) * 2
+    hitbox = state.player_hitbox()
+    # Expired obstacles are compacted out in place, keeping spawn (= x) order.
+    obstacles = state.obstacles
+    kept = 0
+    for obstacle in obstacles:
+        rect = obstacle.rect
+        rect.x -= state.obstacle_speed
+        if obstacle.kind == SPIKE:
+            rect.y += wobble
+        if rect.x + OBSTACLE_WIDTH >= 0:
+            obstacles[kept] = obstacle
+            kept += 1
+        else:
+            state.score += 1
+            state.events.append("score")
+            if state.score % SPEEDUP_EVERY == 0 and state.spawn_interval > MIN_SPAWN_INTERVAL:
+                state.spawn_interval -= SPAWN_INTERVAL_STEP
+                state.obstacle_speed += SPEED_STEP
+    del obstacles[kept:]
+
+    # Each obstacle's position is final once it has moved, so testing after
+    # the loop finds the same hits; obstacles that just left the screen can't
+    # reach the hitbox anyway.
+    if not state.invincible:
+        for obstacle in collision.candidates(state.obstacles, hitbox):
+            if collision.hits(hitbox, obstacle, state.masks):
+                state.events.append("collision")
+                state.killed_by = obstacle.kind
+                state.shake_timer = 10
+                state.game_active = False
+                state.game_over = True
+
+    # --- Powerups ---
+    state.powerup_timer += 1
+    if state.course is None and state.powerup_timer > POWERUP_INTERVAL:
+        p_type = rng.choice(POWERUP_TYPES)
+        state.powerups.append(Powerup(pygame.Rect(WIDTH, rng.randint(150, 250), POWERUP_SIZE, POWERUP_SIZE), p_type))
+        state.powerup_timer = 0
+
+    powerups = state.powerups
+    kept = 0
+    for p in powerups:
+        p.rect.x -= POWERUP_SPEED
+        if player_rect.colliderect(p.rect):
+            state.events.append("powerup")
+            state.active_powerup = p.kind
+            state.powerup_timer = 0
+            if p.kind == SCORE_BOOST:
+                state.score += 5
+            elif p.kind == SLOWDOWN:
+                state.obstacle_speed = max(SLOWDOWN_MIN_SPEED, state.obstacle_speed - SLOWDOWN_STEP)
+            elif p.kind == INVINCIBLE:
+                state.invincible = True
+        elif p.rect.right >= 0:
+            # Off-screen powerups can never be collected again, so they are dropped too.
+            powerups[kept] = p
+            kept += 1
+    del powerups[kept:]
+
+    if state.active_powerup is not None:
+        state.powerup_timer += 1
+        if state.powerup_timer >= POWERUP_DURATION:
+            if state.active_powerup == SLOWDOWN:
+                state.obstacle_speed += SLOWDOWN_STEP
+            elif state.active_powerup == INVINCIBLE:
+                state.invincible = False
+            state.active_powerup = None
+            state.powerup_timer = 0
+
+    # --- Screen shake ---
+    if state.shake_timer > 0:
+        state.shake_timer -= 1
+
+    return state.events
+
+
+def autopilot(state, lead=14, double_jump_velocity=-8):
+    """Scripted jumper: jump `lead` frames before the next obstacle, double jump on the way up."""
+    hitbox_left = PLAYER_X + 5
+    ahead = [o.rect.x for o in state.obstacles if o.rect.x + OBSTACLE_WIDTH > hitbox_left]
+    if not state.game_active or not ahead:
+        return NO_INPUT
+    dist = min(ahead) - (hitbox_left + 40)
+    if state.on_ground() and dist < state.obstacle_speed * lead:
+        return Inputs(jump_pressed=True)
+    if state.jumps_left == 1 and state.player_velocity > double_jump_velocity:
+        return Inputs(jump_pressed=True)
+    return NO_INPUT
+
+
+def run(state, inputs_for_frame, max_frames):
+    """Step until game over or max_frames; inputs_for_frame(state) -> Inputs."""
+    for _ in range(max_frames):
+        step(state, inputs_for_frame(state))
+        if state.game_over:
+            break
+    return state
@@ -0,0 +1,84 @@
+"""Pre-rendered obstacle and powerup sprites.
+
+Every look an obstacle or powerup can have is baked once into a surface in
+display format, keyed on (shape, height bucket, glow colour), so drawing one
+is a single blit. Glow colours come from pulse(), which is evaluated once per
+frame and quantized to a few levels, so an animated glow cycles through a
+small set of baked frames.
+
+Heights are rounded up to the bucket size and sprites are anchored at the
+top, so a sprite can reach up to `height_bucket - 1` pixels below its
+collision rect. Obstacles stand on the bottom edge, so that part is off screen.
+"""
+import math
+
+import pygame
+
+from text_cache import quantize
+
+RED = (255, 0, 0)
+WHITE = (255, 255, 255)
+OBSTACLE_WIDTH = 50
+COLORKEY = (255, 0, 255)
+
+
+def pulse(phase, levels=16):
+    """128 + 127*sin(phase), snapped to `levels` steps (1..255)."""
+    return 1 + int(254 * quantize((math.sin(phase) + 1) / 2, levels))
+
+
+class SpriteCache:
+    def __init__(self, height_bucket=4):
+        self.height_bucket = height_bucket
+        self.sprites = {}
+        self.baked = 0
+
+    def _bucket(self, height):
+        b = self.height_bucket
+        return -(-height // b) * b
+
+    def _finish(self, key, surf, keyed):
+        if keyed:
+            surf.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        self.sprites[key] = surf
+        self.baked += 1
+        return surf
+
+    def firewall(self, height, glow, pad):
+        """Red block with a `pad`-pixel glow border; blit at (x - pad, y - pad)."""
+        height = self._bucket(height)
+        key = ("firewall", height, glow, pad)
+        surf = self.sprites.get(key)
+        if surf is None:
+            surf = pygame.Surface((OBSTACLE_WIDTH + pad * 2, height + pad * 2))
+            surf.fill(glow)
+            surf.fill(RED, (pad, pad, OBSTACLE_WIDTH, height))
+            surf = self._finish(key, surf, keyed=False)
+        return surf
+
+    def spike(self, height, glow, drop=3):
+        """White triangle over a glow copy shifted down by `drop`; blit at (x, y)."""
+        height = self._bucket(height)
+        key = ("spike", height, glow, drop)
+        surf = self.sprites.get(key)
+        if surf is None:
+            surf = pygame.Surface((OBSTACLE_WIDTH + 1, height + drop + 1))
+            surf.fill(COLORKEY)
+            points = [(0, height), (OBSTACLE_WIDTH // 2, 0), (OBSTACLE_WIDTH, height)]
+            pygame.draw.polygon(surf, glow, [(x, y + drop) for x, y in points])
+            pygame.draw.polygon(surf, WHITE, points)
+            surf = self._finish(key, surf, keyed=True)
+        return surf
+
+    def orb(self, radius, color):
+        """Filled circle; blit at (center_x - radius, center_y - radius)."""
+        key = ("orb", radius, color)
+        surf = self.sprites.get(key)
+        if surf is None:
+            surf = pygame.Surface((radius * 2, radius * 2))
+            surf.fill(COLORKEY)
+            pygame.draw.circle(surf, color, (radius, radius), radius)
+            surf = self._finish(key, surf, keyed=True)
+        return surf
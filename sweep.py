@@ -0,0 +1,175 @@
+"""Parameter sweeps for balancing main.py's difficulty curve.
+
+Every point of a grid of difficulty constants gets thousands of headless
+games on batch_sim's vectorized engine, spread over a process pool in
+chunks, with a scripted (autopilot) or random jumper. Each game's survival
+time and score go to a compressed .npz of flat columns (one row per game,
+plus one row per grid point for the parameters and summaries), which
+np.load() reads back without unpickling anything.
+
+    python sweep.py --grid spawn_interval=70,90,110 obstacle_speed=4,5,6
+    python sweep.py --grid speed_step=0.25,0.5 --policy random --games 20000 -o speed.npz
+
+Run `python sweep.py --list` to see the constants that can be swept.
+"""
+import argparse
+import itertools
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+import batch_sim
+import simulation as sim
+
+# Sweepable names -> simulation constants. batch_sim reads them at call time.
+TUNABLES = {
+    "gravity": "GRAVITY",
+    "jump_strength": "JUMP_STRENGTH",
+    "jump_cut": "JUMP_CUT",
+    "spawn_interval": "SPAWN_INTERVAL",
+    "min_spawn_interval": "MIN_SPAWN_INTERVAL",
+    "obstacle_speed": "OBSTACLE_SPEED",
+    "pair_chance": "PAIR_CHANCE",
+    "speedup_every": "SPEEDUP_EVERY",
+    "spawn_interval_step": "SPAWN_INTERVAL_STEP",
+    "speed_step": "SPEED_STEP",
+    "powerup_interval": "POWERUP_INTERVAL",
+    "powerup_duration": "POWERUP_DURATION",
+}
+DEFAULTS = {name: getattr(sim, const) for name, const in TUNABLES.items()}
+POLICIES = ("autopilot", "random")
+
+
+def parse_grid(specs):
+    """["name=v1,v2", ...] -> (names, list of value tuples, one per point)."""
+    axes = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        name = name.strip().lower()
+        if name not in TUNABLES:
+            raise ValueError(f"unknown constant {name!r} (try --list)")
+        if not values:
+            raise ValueError(f"no values given for {name}")
+        axes[name] = [float(v) if "." in v else int(v) for v in values.split(",")]
+    return list(axes), list(itertools.product(*axes.values()))
+
+
+# --- Worker: one chunk of games at one grid point ---
+def run_chunk(task):
+    point, params, seed, n, max_frames, policy = task
+    for name, value in DEFAULTS.items():
+        setattr(sim, TUNABLES[name], params.get(name, value))
+    try:
+        batch = batch_sim.BatchState(n, seed=seed)
+        rng = np.random.default_rng([seed, 1])
+        batch_sim.step(batch, np.ones(n, bool))
+        for _ in range(max_frames - 1):
+            if batch.game_over.all():
+                break
+            if policy == "autopilot":
+                pressed, released = batch_sim.autopilot(batch), None
+            else:
+                pressed, released = rng.random(n) < 0.04, rng.random(n) < 0.1
+            batch_sim.step(batch, pressed & ~batch.game_over, released)
+        return point, batch.frame.copy(), batch.score.copy(), ~batch.game_over, batch.overflow
+    finally:
+        # With workers=1 this runs in the caller's process, which keeps using sim.
+        for name, value in DEFAULTS.items():
+            setattr(sim, TUNABLES[name], value)
+
+
+def sweep(names, points, games=2000, max_frames=20_000, policy="autopilot", workers=None, seed=0, chunk=500):
+    """Run every point; returns the column dict written by save()."""
+    tasks = []
+    for point, values in enumerate(points):
+        params = dict(zip(names, values))
+        for start in range(0, games, chunk):
+            tasks.append((point, params, [seed, point, start], min(chunk, games - start), max_frames, policy))
+    workers = max(1, min(len(tasks), workers or os.cpu_count() or 1))
+    parts, overflow = [], 0
+    pool = mp.Pool(workers) if workers > 1 else None
+    try:
+        for result in pool.imap_unordered(run_chunk, tasks) if pool else map(run_chunk, tasks):
+            parts.append(result[:4])
+            overflow += result[4]
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    parts.sort(key=lambda part: part[0])
+
+    columns = {
+        "point": np.concatenate([np.full(len(p[1]), p[0], np.uint32) for p in parts]),
+        "survival": np.concatenate([p[1] for p in parts]).astype(np.uint32),
+        "score": np.concatenate([p[2] for p in parts]).astype(np.uint32),
+        "truncated": np.concatenate([p[3] for p in parts]),
+    }
+    for i, name in enumerate(names):
+        columns[f"param_{name}"] = np.array([values[i] for values in points])
+    by_point = [columns["survival"][columns["point"] == p] for p in range(len(points))]
+    scores = [columns["score"][columns["point"] == p] for p in range(len(points))]
+    columns["survival_mean"] = np.array([s.mean() for s in by_point], np.float32)
+    for q in (10, 50, 90):
+        columns[f"survival_p{q}"] = np.array([np.percentile(s, q) for s in by_point], np.float32)
+    columns["score_mean"] = np.array([s.mean() for s in scores], np.float32)
+    columns["score_p90"] = np.array([np.percentile(s, 90) for s in scores], np.float32)
+    columns["truncated_rate"] = np.array([columns["truncated"][columns["point"] == p].mean()
+                                          for p in range(len(points))], np.float32)
+    columns["overflow"] = np.array(overflow)
+    return columns
+
+
+def save(path, columns, meta):
+    np.savez_compressed(path, **columns, **{f"meta_{k}": np.array(v) for k, v in meta.items()})
+
+
+def print_table(names, points, columns):
+    header = "".join(f"{name:>20}" for name in names)
+    print(f"{header}{'mean s':>9}{'p10 s':>8}{'p50 s':>8}{'p90 s':>8}{'score':>8}{'trunc':>7}")
+    for p, values in enumerate(points):
+        row = "".join(f"{value:>20}" for value in values)
+        seconds = [columns[key][p] / sim.FPS for key in ("survival_mean", "survival_p10", "survival_p50", "survival_p90")]
+        print(row + "".join(f"{s:8.1f}" for s in seconds)
+              + f"{columns['score_mean'][p]:8.1f}{columns['truncated_rate'][p]:7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sweep difficulty constants over headless batch games")
+    parser.add_argument("--grid", nargs="+", metavar="NAME=V1,V2", default=[],
+                        help="constants to sweep; points are the cartesian product")
+    parser.add_argument("--games", type=int, default=2000, help="games per grid point")
+    parser.add_argument("--max-frames", type=int, default=20_000, help="frames before a game counts as truncated")
+    parser.add_argument("--policy", choices=POLICIES, default="autopilot")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=500, help="games per task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--out", default="sweep.npz")
+    parser.add_argument("--list", action="store_true", help="list the sweepable constants and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, value in DEFAULTS.items():
+            print(f"{name:<20} {value}")
+        return
+    try:
+        names, points = parse_grid(args.grid)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    columns = sweep(names, points, args.games, args.max_frames, args.policy, args.workers, args.seed, args.chunk)
+    elapsed = time.perf_counter() - start
+    save(args.out, columns, {"policy": args.policy, "games": args.games, "max_frames": args.max_frames,
+                             "seed": args.seed, "names": names})
+    print_table(names, points, columns)
+    games = len(columns["survival"])
+    print(f"{games:,} games, {int(columns['survival'].sum()):,} frames in {elapsed:.1f} s; wrote {args.out}")
+    if columns["overflow"]:
+        print(f"warning: {int(columns['overflow'])} spawns dropped for lack of slots", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
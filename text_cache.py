@@ -0,0 +1,98 @@
+"""Cached text rendering for HUD, titles and pulsing prompts.
+
+TextCache keeps rendered surfaces in an LRU keyed on (font, text, colour),
+so static labels are rendered once. ScoreCounter composes "Score: N" from
+a per-digit atlas and only redraws the digits that changed. quantize()
+snaps animated colours onto a few levels so pulsing text cycles through a
+small set of cached surfaces instead of rendering a new one every frame.
+"""
+from collections import OrderedDict
+
+import pygame
+
+BLACK = (0, 0, 0)
+
+
+class TextCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self.surfaces[key] = font.render(text, antialias, color)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def summary(self):
+        total = max(1, self.hits + self.misses)
+        return (f"text cache: {self.hits} hits, {self.misses} misses ({self.hits / total:.1%} hit rate), "
+                f"{self.evictions} evictions, {len(self.surfaces)} cached")
+
+
+def quantize(value, levels=16):
+    """Snap a 0..1 animation value onto `levels` evenly spaced steps."""
+    return round(value * (levels - 1)) / (levels - 1)
+
+
+class ScoreCounter:
+    """Outlined "<label><number>" text that recomposes only the digits that changed.
+
+    Digits sit in fixed-width cells as wide as the widest outlined digit glyph,
+    so a cell can be cleared and redrawn without touching its neighbours.
+    """
+
+    def __init__(self, font, color, label="Score: ", outline=True):
+        shadow = 2 if outline else 0
+        self.label = self._glyph(font, label, color, outline, shadow)
+        self.digits = [self._glyph(font, str(d), color, outline, shadow) for d in range(10)]
+        self.cell = max(g.get_width() for g in self.digits)
+        self.height = max(g.get_height() for g in self.digits + [self.label])
+        self.shadow = shadow
+        self.text = None
+        self.surface = None
+        self.composed = 0  # digit cells redrawn, for comparison against full re-renders
+
+    @staticmethod
+    def _glyph(font, text, color, outline, shadow):
+        fg = font.render(text, True, color)
+        surf = pygame.Surface((fg.get_width() + shadow, fg.get_height() + shadow), pygame.SRCALPHA)
+        if outline:
+            surf.blit(font.render(text, True, BLACK), (shadow, shadow))
+        surf.blit(fg, (0, 0))
+        return surf
+
+    def render(self, value):
+        text = str(value)
+        if text == self.text:
+            return self.surface
+        label_width = self.label.get_width() - self.shadow
+        if self.text is None or len(text) != len(self.text):
+            width = label_width + self.cell * len(text)
+            self.surface = pygame.Surface((width, self.height), pygame.SRCALPHA)
+            self.surface.blit(self.label, (0, 0))
+            old = " " * len(text)
+        else:
+            old = self.text
+        for i, (before, after) in enumerate(zip(old, text)):
+            if before != after:
+                x = label_width + i * self.cell
+                self.surface.fill((0, 0, 0, 0), (x, 0, self.cell, self.height))
+                self.surface.blit(self.digits[ord(after) - 48], (x, 0))
+                self.composed += 1
+        self.text = text
+        return self.surface
+
+    def draw(self, surface, value, x, y):
+        return surface.blit(self.render(value), (x, y))
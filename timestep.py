@@ -0,0 +1,124 @@
+"""Fixed-timestep loop helpers shared by main.py and rialo_runner.py.
+
+Gameplay advances in fixed ticks (TICK_RATE per second) regardless of how
+fast frames are rendered. Each rendered frame asks FixedTimestep how many
+ticks to run for the real time that passed, then draws positions blended
+between the last two ticks with Interpolator.
+"""
+import argparse
+import time
+
+import pygame
+
+TICK_RATE = 60
+MAX_CATCH_UP_STEPS = 5
+MENU_FPS = 60  # static screens only redraw a pulsing prompt; no need to spin a core on them
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=TICK_RATE, max_steps=MAX_CATCH_UP_STEPS):
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped_time = 0.0
+        self.last = None
+
+    def advance(self, now=None):
+        """Return how many ticks to run for the time elapsed since the last call."""
+        if now is None:
+            now = time.perf_counter()
+        if self.last is None:
+            self.last = now - self.dt  # run one tick on the first frame
+        self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            # A long stall (window drag, breakpoint, slow frame): run a bounded
+            # number of ticks and let the game slow down rather than spiral.
+            self.dropped_time += (steps - self.max_steps) * self.dt
+            self.accumulator -= (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+        self.accumulator -= steps * self.dt
+        return steps
+
+    def tick_end(self, i, steps):
+        """Real time that tick `i` of the `steps` just returned by advance() catches up to."""
+        return self.last - self.accumulator - (steps - 1 - i) * self.dt
+
+    @property
+    def alpha(self):
+        """How far (0..1) the current frame is between the last tick and the next."""
+        return min(1.0, self.accumulator / self.dt)
+
+
+def frame_cap(fps, gameplay):
+    """The clock.tick() cap for a frame: --fps while playing, at most MENU_FPS otherwise."""
+    if gameplay:
+        return fps
+    return min(fps, MENU_FPS) if fps > 0 else MENU_FPS
+
+
+class Interpolator:
+    """Remembers where things were before the latest tick so draws can be blended."""
+
+    def __init__(self):
+        self.alpha = 1.0
+        self.rects = {}
+        self.values = {}
+        self.ticks = 0
+
+    def capture(self, rects=(), entities=(), **values):
+        """Remember `rects` and the rect of every entity in each list of `entities`."""
+        # Entries are overwritten in place rather than rebuilt every tick. Keeping
+        # the rect itself alive means its id() can't be reused by a new one.
+        self.ticks += 1
+        stored, tick = self.rects, self.ticks
+        for r in rects:
+            stored[id(r)] = (r, r.x, r.y, tick)
+        count = len(rects)
+        for group in entities:
+            count += len(group)
+            for entity in group:
+                r = entity.rect
+                stored[id(r)] = (r, r.x, r.y, tick)
+        if len(stored) > 2 * count + 16:
+            self.rects = {key: entry for key, entry in stored.items() if entry[3] == tick}
+        self.values = values
+
+    def pos(self, rect):
+        prev = self.rects.get(id(rect))
+        if prev is None or prev[0] is not rect:
+            return rect.x, rect.y
+        a = self.alpha
+        return prev[1] + (rect.x - prev[1]) * a, prev[2] + (rect.y - prev[2]) * a
+
+    def value(self, name, current):
+        prev = self.values.get(name)
+        if prev is None:
+            return current
+        return prev + (current - prev) * self.alpha
+
+
+def add_arguments(parser):
+    parser.add_argument("--fps", type=int, default=0, help=f"gameplay frame cap, 0 for uncapped (default); menus run at most {MENU_FPS}")
+    parser.add_argument("--vsync", action="store_true", help="present in sync with the display refresh rate")
+    parser.add_argument("--max-catch-up", type=int, default=MAX_CATCH_UP_STEPS,
+                        help="most simulation ticks to run for one rendered frame")
+    return parser
+
+
+def parse_args(argv=None, description=None, extra=()):
+    """Parse the render-loop options, plus any added by the `extra` add_arguments functions."""
+    parser = add_arguments(argparse.ArgumentParser(description=description))
+    for add in extra:
+        add(parser)
+    return parser.parse_args(argv)
+
+
+def set_mode(size, vsync=False):
+    if vsync:
+        try:
+            return pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+        except pygame.error:
+            pass  # no vsync-capable renderer; fall back to --fps pacing
+    return pygame.display.set_mode(size)